@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from terminal import Search, board_from_fen
+from uci import move_to_uci
+
+EPD_ID = re.compile(r'\bid\s+"([^"]*)"')
+# Positions in flight per worker; enough to keep every worker busy while the
+# oldest result is written, without reading the whole input ahead.
+IN_FLIGHT_PER_WORKER = 4
+
+# Per-process search, set up once by _init_worker so the transposition table
+# is reused between the positions a worker analyses.
+_search = None
+
+
+def _init_worker():
+    global _search
+    _search = Search()
+
+
+def _analyse(line_number, line, depth, time_ms):
+    """Analyse one FEN or EPD line in a worker; returns its JSON record.
+
+    A position that cannot be parsed or searched gets an "error" field instead
+    of a result, so the output keeps one line per position.
+    """
+    fields = line.split()
+    fen = " ".join(fields[:4])
+    record = {"line": line_number, "fen": fen}
+    match = EPD_ID.search(line)
+    if match:
+        record["id"] = match.group(1)
+    try:
+        board, is_white = board_from_fen(fen)
+    except (ValueError, IndexError) as error:
+        record["error"] = str(error)
+        return record
+    nodes = _search.nodes
+    start = time.perf_counter()
+    try:
+        score, move, reached = _search.iterative_deepening(board, is_white, time_ms, depth)
+    except Exception as error:
+        # Recorded rather than raised: the batch would stop here, and a resume
+        # would start again at this same position.
+        record["error"] = f"{type(error).__name__}: {error}"
+        return record
+    record.update({
+        "bestmove": move_to_uci(move) if move else None,
+        "score": score,
+        "depth": reached,
+        "nodes": _search.nodes - nodes,
+        "time_ms": round((time.perf_counter() - start) * 1000, 1),
+    })
+    return record
+
+
+def read_positions(path, offset):
+    """Yield (line number, line, offset after the line) from byte offset on, skipping blanks and comments."""
+    with open(path, "rb") as positions:
+        positions.seek(offset)
+        line_number = 0
+        for raw in iter(positions.readline, b""):
+            line_number += 1
+            offset += len(raw)
+            line = raw.decode("utf-8", errors="replace").strip()
+            if line and not line.startswith("#"):
+                yield line_number, line, offset
+
+
+def load_checkpoint(path):
+    if path is None or not os.path.exists(path):
+        return {"input_offset": 0, "output_offset": 0, "lines": 0, "positions": 0}
+    with open(path) as checkpoint:
+        return json.load(checkpoint)
+
+
+def save_checkpoint(path, state):
+    # Write then rename so a crash never leaves a half-written checkpoint.
+    with open(path + ".tmp", "w") as checkpoint:
+        json.dump(state, checkpoint)
+    os.replace(path + ".tmp", path)
+
+
+def analyse_file(input_path, output_path, depth=None, time_ms=None, workers=None,
+                 checkpoint_path=None, checkpoint_every=1000, resume=False):
+    """Analyse every position in input_path and append JSON lines to output_path.
+
+    Results are written in input order with at most a few positions per worker
+    in flight, so memory use does not grow with the input. Every
+    checkpoint_every positions the input and output offsets are saved; with
+    resume, the output is cut back to the last checkpoint and analysis carries
+    on from the matching input line. Returns the number of positions written
+    by this run.
+    """
+    workers = workers or os.cpu_count()
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+    state = load_checkpoint(checkpoint_path if resume else None)
+    line_base = state["lines"]
+    written = 0
+
+    mode = "r+b" if resume and os.path.exists(output_path) else "wb"
+    with open(output_path, mode) as output, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        output.truncate(state["output_offset"])
+        output.seek(state["output_offset"])
+        pending = deque()
+
+        def write_oldest():
+            nonlocal written
+            future, line_number, input_offset = pending.popleft()
+            output.write(json.dumps(future.result()).encode() + b"\n")
+            written += 1
+            state.update(input_offset=input_offset, output_offset=output.tell(),
+                         lines=line_number, positions=state["positions"] + 1)
+            if written % checkpoint_every == 0:
+                output.flush()
+                save_checkpoint(checkpoint_path, state)
+
+        for line_number, line, input_offset in read_positions(input_path, state["input_offset"]):
+            line_number += line_base
+            future = pool.submit(_analyse, line_number, line, depth or 64, time_ms)
+            pending.append((future, line_number, input_offset))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                write_oldest()
+        while pending:
+            write_oldest()
+        output.flush()
+        save_checkpoint(checkpoint_path, state)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse every position in a FEN or EPD file and write JSON lines.")
+    parser.add_argument("input", help="file with one FEN or EPD position per line")
+    parser.add_argument("output", help="JSON lines file to write results to")
+    parser.add_argument("--depth", type=int, help="search every position to this depth")
+    parser.add_argument("--time-ms", type=int, help="thinking time per position in milliseconds")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000,
+                        help="save a checkpoint after this many positions")
+    parser.add_argument("--resume", action="store_true", help="carry on from the last checkpoint")
+    args = parser.parse_args()
+    if args.depth is None and args.time_ms is None:
+        parser.error("give --depth, --time-ms or both")
+
+    start = time.perf_counter()
+    written = analyse_file(args.input, args.output, args.depth, args.time_ms, args.workers,
+                           args.checkpoint, args.checkpoint_every, args.resume)
+    elapsed = time.perf_counter() - start
+    print(f"Analysed {written} positions in {elapsed:.1f}s ({written / elapsed:.1f} positions/s).")
+
+
+if __name__ == "__main__":
+    main()
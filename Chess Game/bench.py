@@ -0,0 +1,57 @@
+import argparse
+import time
+
+from terminal import Search, board_from_fen
+
+# Middlegame and endgame positions used to compare search efficiency.
+BENCH_POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq -",
+    "r2q1rk1/ppp2ppp/2np1n2/2b1p1B1/2B1P1b1/2NP1N2/PPP2PPP/R2Q1RK1 b - -",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - -",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - -",
+]
+
+
+def run(depth, board_class=None, **options):
+    """Search every bench position to depth with the given Search options.
+
+    Returns the summed counters of every search and the total time taken.
+    """
+    totals = {"nodes": 0, "quiescence_nodes": 0, "quiescence_time": 0.0, "beta_cutoffs": 0}
+    start = time.perf_counter()
+    for fen in BENCH_POSITIONS:
+        board, is_white = board_from_fen(fen, board_class)
+        search = Search(**options)
+        search.new_search()
+        search.negamax(board, depth, float("-inf"), float("inf"), is_white)
+        for counter in totals:
+            totals[counter] += getattr(search, counter)
+    return totals, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare search effort with different search features.")
+    parser.add_argument("depth", type=int, nargs="?", default=4)
+    args = parser.parse_args()
+
+    configurations = [
+        ("unordered", {"ordering": False, "quiescence": False, "selective": False}),
+        ("ordered", {"quiescence": False, "selective": False}),
+        ("quiescence", {"selective": False}),
+        ("selective", {}),
+    ]
+    for label, options in configurations:
+        totals, elapsed = run(args.depth, **options)
+        nodes = totals["nodes"]
+        print(f"{label:>10}: {nodes} nodes, {totals['beta_cutoffs']} beta cutoffs, "
+              f"{elapsed:.2f}s, {nodes / elapsed:.0f} nps")
+        if totals["quiescence_nodes"]:
+            print(f"{'':>10}  in quiescence search: {totals['quiescence_nodes']} nodes "
+                  f"({totals['quiescence_nodes'] / nodes:.0%}), {totals['quiescence_time']:.2f}s "
+                  f"({totals['quiescence_time'] / elapsed:.0%} of the time)")
+
+
+if __name__ == "__main__":
+    main()
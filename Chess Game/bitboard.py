@@ -0,0 +1,161 @@
+from terminal import (KNIGHT_OFFSETS, KING_OFFSETS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS,
+                      ALL_CASTLING, PROMOTIONS, Board, create_board)
+
+# Bit n of every bitboard is square n of the list board (row * 8 + col), so
+# a8 is bit 0 and h1 is bit 63. Moves use the same tuples as ListBoard.
+WHITE_PIECES = "PNBRQK"
+BLACK_PIECES = "pnbrqk"
+FULL = (1 << 64) - 1
+
+
+def _step_table(offsets):
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        mask = 0
+        for dr, dc in offsets:
+            if 0 <= row + dr < 8 and 0 <= col + dc < 8:
+                mask |= 1 << ((row + dr) * 8 + col + dc)
+        table.append(mask)
+    return table
+
+
+def _ray_table(dr, dc):
+    table = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        mask = 0
+        row, col = row + dr, col + dc
+        while 0 <= row < 8 and 0 <= col < 8:
+            mask |= 1 << (row * 8 + col)
+            row, col = row + dr, col + dc
+        table.append(mask)
+    return table
+
+
+KNIGHT_ATTACKS = _step_table(KNIGHT_OFFSETS)
+KING_ATTACKS = _step_table(KING_OFFSETS)
+PAWN_ATTACKS = {True: _step_table([(-1, -1), (-1, 1)]), False: _step_table([(1, -1), (1, 1)])}
+
+# Rays are keyed by the square delta of one step; positive deltas walk towards
+# higher bits, so their first blocker is the lowest set bit.
+RAYS = {dr * 8 + dc: _ray_table(dr, dc) for dr, dc in ROOK_DIRECTIONS + BISHOP_DIRECTIONS}
+ROOK_DELTAS = [dr * 8 + dc for dr, dc in ROOK_DIRECTIONS]
+BISHOP_DELTAS = [dr * 8 + dc for dr, dc in BISHOP_DIRECTIONS]
+SLIDING_DELTAS = {"r": ROOK_DELTAS, "b": BISHOP_DELTAS, "q": ROOK_DELTAS + BISHOP_DELTAS}
+
+
+def sliding_attacks(sq, occupied, deltas):
+    """Squares a slider on sq attacks along deltas, stopping at the first blocker."""
+    attacks = 0
+    for delta in deltas:
+        ray = RAYS[delta][sq]
+        blockers = ray & occupied
+        if blockers:
+            if delta > 0:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= RAYS[delta][first]
+        attacks |= ray
+    return attacks
+
+
+def iter_bits(bb):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+class BitBoard(Board):
+    """Board backend with one 64-bit integer per piece type and side.
+
+    A 64-entry mailbox mirrors the bitboards so piece_at is a list lookup.
+    """
+
+    def __init__(self, squares=None, is_white=True, castling=ALL_CASTLING, ep_square=None):
+        squares = squares if squares is not None else create_board()
+        self.pieces = {piece: 0 for piece in WHITE_PIECES + BLACK_PIECES}
+        self.occupied = {True: 0, False: 0}
+        self.mailbox = ["."] * 64
+        for row in range(8):
+            for col in range(8):
+                if squares[row][col] != ".":
+                    self._place(row * 8 + col, squares[row][col])
+        self._init_state(is_white, castling, ep_square)
+
+    def piece_at(self, sq):
+        return self.mailbox[sq]
+
+    def _place(self, sq, piece):
+        bit = 1 << sq
+        self.pieces[piece] |= bit
+        self.occupied[piece.isupper()] |= bit
+        self.mailbox[sq] = piece
+
+    def _clear(self, sq, piece):
+        bit = 1 << sq
+        self.pieces[piece] ^= bit
+        self.occupied[piece.isupper()] ^= bit
+        self.mailbox[sq] = "."
+
+    def is_attacked(self, sq, by_white):
+        """Whether any piece of the given side attacks square sq."""
+        pawn, knight, bishop, rook, queen, king = WHITE_PIECES if by_white else BLACK_PIECES
+        pieces = self.pieces
+        if PAWN_ATTACKS[not by_white][sq] & pieces[pawn]:
+            return True
+        if KNIGHT_ATTACKS[sq] & pieces[knight] or KING_ATTACKS[sq] & pieces[king]:
+            return True
+        occupied = self.occupied[True] | self.occupied[False]
+        if sliding_attacks(sq, occupied, BISHOP_DELTAS) & (pieces[bishop] | pieces[queen]):
+            return True
+        return bool(sliding_attacks(sq, occupied, ROOK_DELTAS) & (pieces[rook] | pieces[queen]))
+
+    def has_non_pawn_material(self, is_white):
+        names = WHITE_PIECES if is_white else BLACK_PIECES
+        return any(self.pieces[piece] for piece in names[1:5])
+
+    def generate_pseudo_moves(self, is_white):
+        moves = []
+        own = self.occupied[is_white]
+        enemy = self.occupied[not is_white]
+        empty = FULL ^ (own | enemy)
+        names = WHITE_PIECES if is_white else BLACK_PIECES
+        mailbox = self.mailbox
+        self._pawn_moves(names[0], is_white, enemy, empty, moves)
+        for piece in names[1:]:
+            kind = piece.lower()
+            for sq in iter_bits(self.pieces[piece]):
+                if kind == "n":
+                    targets = KNIGHT_ATTACKS[sq]
+                elif kind == "k":
+                    targets = KING_ATTACKS[sq]
+                else:
+                    targets = sliding_attacks(sq, own | enemy, SLIDING_DELTAS[kind])
+                for to_sq in iter_bits(targets & ~own):
+                    moves.append((sq, to_sq, mailbox[to_sq], None))
+        self._castling_moves(is_white, moves)
+        return moves
+
+    def _pawn_moves(self, pawn, is_white, enemy, empty, moves):
+        step = -8 if is_white else 8
+        start_row = 6 if is_white else 1
+        last_row = 0 if is_white else 7
+        ep_bit = 1 << self.ep_square if self.ep_square is not None else 0
+        enemy_pawn = "p" if is_white else "P"
+        for sq in iter_bits(self.pieces[pawn]):
+            to_sq = sq + step
+            promotions = PROMOTIONS[is_white] if to_sq // 8 == last_row else [None]
+            if empty >> to_sq & 1:
+                for promotion in promotions:
+                    moves.append((sq, to_sq, ".", promotion))
+                if sq // 8 == start_row and empty >> (to_sq + step) & 1:
+                    moves.append((sq, to_sq + step, ".", None))
+            attacks = PAWN_ATTACKS[is_white][sq]
+            for target in iter_bits(attacks & enemy):
+                for promotion in promotions:
+                    moves.append((sq, target, self.mailbox[target], promotion))
+            if attacks & ep_bit:
+                moves.append((sq, self.ep_square, enemy_pawn, None))
@@ -0,0 +1,204 @@
+import argparse
+import mmap
+import os
+import random
+import re
+import struct
+
+from terminal import START_FEN, board_from_fen, parse_square
+
+# Book files use the Polyglot record layout: 16-byte big-endian entries of
+# (key u64, move u16, weight u16, learn u32) sorted by key. The key is this
+# engine's Zobrist hash rather than Polyglot's own, so books must be built
+# with this tool.
+ENTRY = struct.Struct(">QHHI")
+KEY = struct.Struct(">Q")
+PROMOTION_CODES = {None: 0, "n": 1, "b": 2, "r": 3, "q": 4}
+# Polyglot writes castling as the king taking its own rook.
+CASTLING_CODES = {(60, 62): 63, (60, 58): 56, (4, 6): 7, (4, 2): 0}
+
+
+def encode_move(board, move):
+    from_sq, to_sq, _, promotion = move
+    if board.piece_at(from_sq) in ("K", "k") and (from_sq, to_sq) in CASTLING_CODES:
+        to_sq = CASTLING_CODES[(from_sq, to_sq)]
+    code = (to_sq % 8) | (7 - to_sq // 8) << 3 | (from_sq % 8) << 6 | (7 - from_sq // 8) << 9
+    return code | PROMOTION_CODES[promotion.lower() if promotion else None] << 12
+
+
+class OpeningBook:
+    """Read-only opening book memory-mapped from disk and searched by bisection."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.count = size // ENTRY.size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def close(self):
+        if self.count:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def entries(self, key):
+        """Return the (move code, weight) pairs stored for a position key."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self.data, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < self.count:
+            entry_key, code, weight, _ = ENTRY.unpack_from(self.data, low * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((code, weight))
+            low += 1
+        return found
+
+    def choose_move(self, board, is_white, rng=random):
+        """Pick a book move for the position, weighted by its count, or None."""
+        entries = self.entries(board.hash)
+        if not entries:
+            return None
+        by_code = {encode_move(board, move): move for move in board.generate_moves(is_white)}
+        candidates = [(by_code[code], weight) for code, weight in entries if code in by_code and weight]
+        if not candidates:
+            return None
+        moves, weights = zip(*candidates)
+        return rng.choices(moves, weights)[0]
+
+
+SAN_PATTERN = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$")
+
+
+def parse_san(board, is_white, san):
+    """Find the legal move written in standard algebraic notation, or None."""
+    san = san.rstrip("+#!?")
+    moves = board.generate_moves(is_white)
+    if san in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        king_sq = 60 if is_white else 4
+        to_sq = king_sq + (2 if len(san) == 3 else -2)
+        for move in moves:
+            if move[0] == king_sq and move[1] == to_sq and board.piece_at(king_sq).upper() == "K":
+                return move
+        return None
+    match = SAN_PATTERN.match(san)
+    if not match:
+        return None
+    piece, from_file, from_rank, target, promotion = match.groups()
+    piece = piece or "P"
+    to_sq = parse_square(target)
+    for move in moves:
+        from_sq = move[0]
+        if move[1] != to_sq or board.piece_at(from_sq).upper() != piece:
+            continue
+        if from_file and "abcdefgh"[from_sq % 8] != from_file:
+            continue
+        if from_rank and str(8 - from_sq // 8) != from_rank:
+            continue
+        if (move[3].upper() if move[3] else None) != promotion:
+            continue
+        return move
+    return None
+
+
+MOVETEXT_NOISE = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+|\d+\.(\.\.)?")
+RESULTS = {"1-0": 1, "0-1": -1, "1/2-1/2": 0, "*": None}
+
+
+def read_games(path):
+    """Yield (result, SAN moves) for each game in a PGN file, one game at a time."""
+    headers_result = None
+    movetext = []
+    with open(path, encoding="utf-8", errors="replace") as pgn:
+        for line in pgn:
+            line = line.strip()
+            if line.startswith("["):
+                if movetext:
+                    yield headers_result, _san_tokens("\n".join(movetext))
+                    movetext = []
+                    headers_result = None
+                if line.startswith("[Result "):
+                    headers_result = RESULTS.get(line.split('"')[1])
+            elif line:
+                movetext.append(line)
+    if movetext:
+        yield headers_result, _san_tokens("\n".join(movetext))
+
+
+def _san_tokens(movetext):
+    text = MOVETEXT_NOISE.sub(" ", movetext)
+    # Drop variations, which may nest.
+    depth = 0
+    kept = []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            kept.append(char)
+    return [token for token in "".join(kept).split() if token not in RESULTS]
+
+
+def build_book(pgn_dir, output, max_ply=20, min_count=2):
+    """Build a book from every .pgn file in pgn_dir, reading one game at a time.
+
+    Each move is weighted 2 for a win, 1 for a draw and 0 for a loss from the
+    mover's side, as Polyglot does; moves seen fewer than min_count times are
+    dropped. Returns the number of games read.
+    """
+    weights = {}
+    games = 0
+    for name in sorted(os.listdir(pgn_dir)):
+        if not name.lower().endswith(".pgn"):
+            continue
+        for result, sans in read_games(os.path.join(pgn_dir, name)):
+            games += 1
+            board, is_white = board_from_fen(START_FEN)
+            for san in sans[:max_ply]:
+                move = parse_san(board, is_white, san)
+                if move is None:
+                    break
+                key = (board.hash, encode_move(board, move))
+                count, score = weights.get(key, (0, 0))
+                if result is None:
+                    points = 1
+                else:
+                    points = 1 + (result if is_white else -result)
+                weights[key] = (count + 1, score + points)
+                board.make_move(move)
+                is_white = not is_white
+
+    records = sorted((key, code, score) for (key, code), (count, score) in weights.items() if count >= min_count)
+    scale = max((score for _, _, score in records), default=0) / 0xFFFF
+    with open(output, "wb") as book:
+        for key, code, score in records:
+            weight = int(score / scale) if scale > 1 else score
+            book.write(ENTRY.pack(key, code, max(weight, 1) if score else 0, 0))
+    return games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an opening book from a directory of PGN files.")
+    parser.add_argument("pgn_dir")
+    parser.add_argument("output")
+    parser.add_argument("--max-ply", type=int, default=20, help="only store this many plies of each game")
+    parser.add_argument("--min-count", type=int, default=2, help="drop moves played fewer times than this")
+    args = parser.parse_args()
+
+    games = build_book(args.pgn_dir, args.output, args.max_ply, args.min_count)
+    print(f"Read {games} games into {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
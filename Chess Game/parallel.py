@@ -0,0 +1,195 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from terminal import Search, board_from_fen
+from bench import BENCH_POSITIONS
+
+# Per-process state, set up once by _init_worker when the pool starts.
+_shared_alpha = None
+_search = None
+
+
+def _init_worker(shared_alpha, tablebase_directory):
+    global _shared_alpha, _search
+    _shared_alpha = shared_alpha
+    tablebases = None
+    if tablebase_directory is not None:
+        # Memory maps cannot be sent to another process, so each worker opens its own.
+        from tablebase import Tablebases
+        tablebases = Tablebases(tablebase_directory)
+    _search = Search(tablebases=tablebases)
+
+
+def _search_root_move(board, is_white, move, depth, time_left):
+    """Search one root move in a worker.
+
+    Returns (score, nodes, quiescence nodes), with a score of None on timeout.
+    """
+    search = _search
+    search.new_search()
+    search.deadline = time.perf_counter() + time_left if time_left is not None else None
+    nodes, quiescence_nodes = search.nodes, search.quiescence_nodes
+    board.make_move(move)
+    alpha = _shared_alpha.value
+    score = -search.negamax(board, depth - 1, float("-inf"), -alpha, not is_white, 1)[0]
+    board.unmake_move(move)
+    search.deadline = None
+    counts = (search.nodes - nodes, search.quiescence_nodes - quiescence_nodes)
+    if search.stopped:
+        return (None,) + counts
+    with _shared_alpha.get_lock():
+        if score > _shared_alpha.value:
+            _shared_alpha.value = score
+    return (score,) + counts
+
+
+class ParallelSearch:
+    """Root-parallel search over a pool of worker processes.
+
+    The best-ordered root move is searched first in this process to get a
+    good alpha bound; the remaining root moves are then spread over the pool.
+    Workers share the best score found so far through shared memory and use
+    it as the alpha bound of each root move they start. Each worker keeps its
+    own transposition table between searches. With tablebases (a
+    tablebase.Tablebases) every process probes the same tables.
+    """
+
+    def __init__(self, workers=None, tablebases=None):
+        self.workers = workers or os.cpu_count()
+        self.alpha = multiprocessing.Value("d", float("-inf"))
+        self.tablebases = tablebases
+        self.search = Search(tablebases=tablebases)
+        directory = tablebases.directory if tablebases is not None else None
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(self.alpha, directory))
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.best_move = None
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search_depth(self, board, is_white, depth, deadline=None):
+        """Search board to depth; returns (score, move) for the side to move, or None on timeout."""
+        search = self.search
+        search.new_search()
+        moves = board.generate_moves(is_white)
+        if not moves:
+            return float("-inf"), None
+        search.order_moves(board, moves, 0, (self.best_move,))
+
+        search.deadline = deadline
+        nodes, quiescence_nodes = search.nodes, search.quiescence_nodes
+        first = moves[0]
+        board.make_move(first)
+        best_score = -search.negamax(board, depth - 1, float("-inf"), float("inf"), not is_white, 1)[0]
+        board.unmake_move(first)
+        search.deadline = None
+        self.nodes += search.nodes - nodes
+        self.quiescence_nodes += search.quiescence_nodes - quiescence_nodes
+        if search.stopped:
+            return None
+        best_move = first
+        self.alpha.value = best_score
+
+        time_left = deadline - time.perf_counter() if deadline is not None else None
+        futures = [self.pool.submit(_search_root_move, board, is_white, move, depth, time_left)
+                   for move in moves[1:]]
+        timed_out = False
+        for move, future in zip(moves[1:], futures):
+            score, nodes, quiescence_nodes = future.result()
+            self.nodes += nodes
+            self.quiescence_nodes += quiescence_nodes
+            if score is None:
+                timed_out = True
+            elif score > best_score:
+                best_score, best_move = score, move
+        if timed_out:
+            return None
+        self.best_move = best_move
+        return best_score, best_move
+
+    def iterative_deepening(self, board, is_white, time_budget_ms, max_depth=64, report=None):
+        """Search.iterative_deepening with each depth searched in parallel.
+
+        Takes the same arguments and returns the same (score, move, depth),
+        but cannot be stopped from another thread, so a time_budget_ms of
+        None searches until max_depth. The pv given to report is the best
+        move followed by whatever of its line this process's table holds.
+        """
+        if self.tablebases is not None and board.piece_count <= self.tablebases.max_pieces:
+            found = self.tablebases.best_move(board, is_white)
+            if found is not None:
+                score, move = found
+                if report is not None:
+                    report(1, score, [move])
+                return (score if is_white else -score), move, 1
+        start = time.perf_counter()
+        result = (0, None, 0)
+        for depth in range(1, max_depth + 1):
+            deadline = None
+            if time_budget_ms is not None and depth > 1:
+                deadline = start + time_budget_ms / 1000
+            found = self.search_depth(board, is_white, depth, deadline)
+            if found is None or found[1] is None:
+                break
+            score, move = found
+            result = (score if is_white else -score, move, depth)
+            if report is not None:
+                board.make_move(move)
+                pv = [move] + self.search.principal_variation(board, not is_white, depth - 1)
+                board.unmake_move(move)
+                report(depth, score, pv)
+            if time_budget_ms is not None and time.perf_counter() - start > time_budget_ms / 2000:
+                break
+        return result
+
+
+def benchmark(depth, worker_counts):
+    """Time a fixed-depth search of every bench position for each worker count."""
+    positions = [board_from_fen(fen) for fen in BENCH_POSITIONS]
+
+    start = time.perf_counter()
+    for board, is_white in positions:
+        search = Search()
+        search.new_search()
+        search.negamax(board, depth, float("-inf"), float("inf"), is_white)
+    serial = time.perf_counter() - start
+    print(f"serial: {serial:.2f}s")
+
+    for workers in worker_counts:
+        with ParallelSearch(workers) as parallel:
+            start = time.perf_counter()
+            for board, is_white in positions:
+                parallel.search_depth(board, is_white, depth)
+            elapsed = time.perf_counter() - start
+        print(f"{workers:>3} workers: {elapsed:.2f}s, speedup {serial / elapsed:.2f}x, "
+              f"{parallel.nodes} nodes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark root-parallel search speedup against core count.")
+    parser.add_argument("depth", type=int, nargs="?", default=4)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="worker counts to try (default: powers of two up to the core count)")
+    args = parser.parse_args()
+
+    worker_counts = args.workers
+    if not worker_counts:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= os.cpu_count():
+            worker_counts.append(worker_counts[-1] * 2)
+    benchmark(args.depth, worker_counts)
+
+
+if __name__ == "__main__":
+    main()
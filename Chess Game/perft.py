@@ -0,0 +1,107 @@
+import argparse
+import time
+
+from terminal import ListBoard, START_FEN, board_from_fen
+from bitboard import BitBoard
+
+BACKENDS = {"list": ListBoard, "bitboard": BitBoard}
+
+# Well-known perft positions with their reference leaf counts for depth 1, 2, ...
+PERFT_POSITIONS = [
+    ("start", START_FEN, [20, 400, 8902, 197281, 4865609]),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -",
+     [48, 2039, 97862, 4085603]),
+    ("position 3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - -", [14, 191, 2812, 43238, 674624]),
+    ("position 4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333]),
+    ("position 5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+    ("position 6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     [46, 2079, 89890, 3894594]),
+]
+
+
+def perft(board, depth, is_white):
+    """Count the leaf nodes of the legal move tree below board to the given depth."""
+    if depth == 0:
+        return 1
+    moves = board.generate_moves(is_white)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1, not is_white)
+        board.unmake_move(move)
+    return nodes
+
+
+def compare_backends(list_board, bit_board, depth, is_white, path=()):
+    """Walk both boards in lockstep and return the first move path where they disagree."""
+    list_moves = sorted(list_board.generate_moves(is_white), key=repr)
+    bit_moves = sorted(bit_board.generate_moves(is_white), key=repr)
+    if list_moves != bit_moves or list_board.hash != bit_board.hash:
+        return path
+    if depth == 1:
+        return None
+    for move in list_moves:
+        list_board.make_move(move)
+        bit_board.make_move(move)
+        mismatch = compare_backends(list_board, bit_board, depth - 1, not is_white, path + (move,))
+        list_board.unmake_move(move)
+        bit_board.unmake_move(move)
+        if mismatch is not None:
+            return mismatch
+    return None
+
+
+def run_position(name, fen, depth, expected, backends):
+    """Run perft on one position for each backend; returns True if every count is right."""
+    ok = True
+    for backend in backends:
+        board, is_white = board_from_fen(fen, BACKENDS[backend])
+        start = time.perf_counter()
+        nodes = perft(board, depth, is_white)
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            status = ""
+        elif nodes == expected:
+            status = "ok"
+        else:
+            status = f"FAIL (expected {expected})"
+            ok = False
+        nps = nodes / elapsed if elapsed > 0 else 0
+        print(f"{name:>12} {backend:>8} perft({depth}) = {nodes:>9} {elapsed:7.2f}s {nps:>9.0f} nps {status}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count perft leaf nodes and check them against reference counts.")
+    parser.add_argument("depth", type=int, nargs="?", default=3)
+    parser.add_argument("--fen", help="run a single position instead of the reference set")
+    parser.add_argument("--backend", choices=["list", "bitboard", "both"], default="both")
+    parser.add_argument("--compare", action="store_true",
+                        help="also check both backends generate identical moves at every node")
+    args = parser.parse_args()
+
+    backends = list(BACKENDS) if args.backend == "both" else [args.backend]
+    if args.fen:
+        positions = [("custom", args.fen, [])]
+    else:
+        positions = PERFT_POSITIONS
+
+    ok = True
+    for name, fen, counts in positions:
+        expected = counts[args.depth - 1] if args.depth <= len(counts) else None
+        ok = run_position(name, fen, args.depth, expected, backends) and ok
+        if args.compare:
+            mismatch = compare_backends(board_from_fen(fen, ListBoard)[0], board_from_fen(fen, BitBoard)[0],
+                                        args.depth, board_from_fen(fen)[1])
+            if mismatch is not None:
+                print(f"{name:>12} backends disagree after moves: {mismatch}")
+                ok = False
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
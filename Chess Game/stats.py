@@ -0,0 +1,98 @@
+import argparse
+import json
+import time
+
+from terminal import Search, board_from_fen
+from bench import BENCH_POSITIONS
+from uci import move_to_uci
+
+# Search counters snapshotted after every depth; each depth's record holds
+# the difference from the depth before.
+COUNTERS = ("nodes", "quiescence_nodes", "tt_hits", "beta_cutoffs", "first_move_cutoffs", "quiescence_time")
+
+
+class SearchStats:
+    """Collects per-depth statistics from Search.iterative_deepening.
+
+    Pass one to Search(stats=...). It reads the counters Search always keeps
+    once per finished depth, so nodes cost nothing extra with it on or off.
+    Each search appends a list of depth records to searches.
+    """
+
+    def __init__(self):
+        self.searches = []
+        self.depths = None
+        self.last = None
+        self.last_time = None
+
+    def begin(self, search):
+        self.depths = []
+        self.searches.append(self.depths)
+        self.last = {counter: getattr(search, counter) for counter in COUNTERS}
+        self.last_time = time.perf_counter()
+
+    def record_depth(self, search, depth, score, pv):
+        now = time.perf_counter()
+        current = {counter: getattr(search, counter) for counter in COUNTERS}
+        record = {counter: current[counter] - self.last[counter] for counter in COUNTERS}
+        record["quiescence_time"] = round(record["quiescence_time"], 6)
+        record.update(depth=depth, score=score, pv=[move_to_uci(move) for move in pv],
+                      time=round(now - self.last_time, 6))
+        previous = self.depths[-1]["nodes"] if self.depths else 0
+        # Effective branching factor: how many times more nodes this depth took than the last.
+        record["ebf"] = round(record["nodes"] / previous, 2) if previous else None
+        cutoffs = record["beta_cutoffs"]
+        record["first_move_cutoff_rate"] = round(record["first_move_cutoffs"] / cutoffs, 3) if cutoffs else None
+        self.depths.append(record)
+        self.last, self.last_time = current, now
+
+    def to_json(self):
+        return json.dumps({"searches": self.searches}, indent=2)
+
+    def folded_stacks(self):
+        """Time per depth as folded stacks ("frame;frame microseconds") for flamegraph tools."""
+        lines = []
+        for index, depths in enumerate(self.searches, 1):
+            for record in depths:
+                frames = f"search {index};depth {record['depth']}"
+                quiescence = int(record["quiescence_time"] * 1e6)
+                main = int(record["time"] * 1e6) - quiescence
+                lines.append(f"{frames};negamax {max(main, 0)}")
+                if quiescence:
+                    lines.append(f"{frames};negamax;quiescence {quiescence}")
+        return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record per-depth search statistics on the bench positions.")
+    parser.add_argument("depth", type=int, nargs="?", default=6)
+    parser.add_argument("--json", help="write the statistics to this JSON file")
+    parser.add_argument("--folded", help="write time per depth as folded stacks for flamegraph.pl")
+    args = parser.parse_args()
+
+    stats = SearchStats()
+    for fen in BENCH_POSITIONS:
+        board, is_white = board_from_fen(fen)
+        Search(stats=stats).iterative_deepening(board, is_white, None, args.depth)
+
+    print(f"{'depth':>5} {'nodes':>9} {'qnodes':>9} {'tt hits':>8} {'cutoffs':>8} {'first':>6} {'ebf':>6} {'time':>7}")
+    for depth in range(1, args.depth + 1):
+        records = [record for depths in stats.searches for record in depths if record["depth"] == depth]
+        totals = {counter: sum(record[counter] for record in records) for counter in COUNTERS + ("time",)}
+        previous = [record for depths in stats.searches for record in depths if record["depth"] == depth - 1]
+        previous_nodes = sum(record["nodes"] for record in previous)
+        ebf = f"{totals['nodes'] / previous_nodes:.2f}" if previous_nodes else "-"
+        first = f"{totals['first_move_cutoffs'] / totals['beta_cutoffs']:.0%}" if totals["beta_cutoffs"] else "-"
+        print(f"{depth:>5} {totals['nodes']:>9} {totals['quiescence_nodes']:>9} {totals['tt_hits']:>8} "
+              f"{totals['beta_cutoffs']:>8} {first:>6} {ebf:>6} {totals['time']:>6.2f}s")
+
+    if args.json:
+        with open(args.json, "w") as output:
+            output.write(stats.to_json())
+    if args.folded:
+        with open(args.folded, "w") as output:
+            output.write(stats.folded_stacks())
+
+
+if __name__ == "__main__":
+    main()
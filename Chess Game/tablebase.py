@@ -0,0 +1,293 @@
+import argparse
+import itertools
+import mmap
+import os
+import time
+
+from bitboard import KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, SLIDING_DELTAS, iter_bits, sliding_attacks
+from terminal import MATE_SCORE, score_from_tt
+
+# Tables cover the white king and one or more white pieces against a lone
+# black king; positions with the colours swapped are probed mirrored. A table
+# named after its material, e.g. KQK.tb or KBNK.tb, holds one byte per
+# position: first every position with white to move, then every position
+# with black to move, indexed by the squares of the white king, the black
+# king and the pieces in PIECE_ORDER. A byte is 0 for a draw (or an illegal
+# position) and otherwise one more than the number of plies until black is
+# mated.
+PIECE_ORDER = "QRBNP"
+PROMOTION_PIECES = "QRBN"
+# Remaining-move count marking a black-to-move position black can hold.
+HELD = 255
+MAX_VALUE = 254
+
+
+def table_name(pieces):
+    return "K" + "".join(pieces) + "K"
+
+
+def canonical(placed):
+    """Sort (piece, square) pairs into table order."""
+    return sorted(placed, key=lambda pair: PIECE_ORDER.index(pair[0]))
+
+
+def white_attacks(wk, placed, occupied):
+    attacks = KING_ATTACKS[wk]
+    for piece, sq in placed:
+        if piece == "N":
+            attacks |= KNIGHT_ATTACKS[sq]
+        elif piece == "P":
+            attacks |= PAWN_ATTACKS[True][sq]
+        else:
+            attacks |= sliding_attacks(sq, occupied, SLIDING_DELTAS[piece.lower()])
+    return attacks
+
+
+class Tablebases:
+    """Endgame tables in a directory, memory-mapped and probed by material."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.tables = {}
+        self.max_pieces = 2
+        for name in os.listdir(directory):
+            if name.endswith(".tb"):
+                self._open(name[:-3])
+
+    def _open(self, name):
+        with open(os.path.join(self.directory, name + ".tb"), "rb") as table:
+            self.tables[name] = mmap.mmap(table.fileno(), 0, access=mmap.ACCESS_READ)
+        self.max_pieces = max(self.max_pieces, len(name))
+
+    def close(self):
+        for table in self.tables.values():
+            table.close()
+
+    def value(self, placed, wk, bk, white_to_move):
+        """Raw table byte for a position, or None if there is no table for its material."""
+        if not placed:
+            return 0
+        placed = canonical(placed)
+        table = self.tables.get(table_name([piece for piece, _ in placed]))
+        if table is None:
+            return None
+        index = wk * 64 + bk
+        for _, sq in placed:
+            index = index * 64 + sq
+        return table[index if white_to_move else index + len(table) // 2]
+
+    def probe(self, board, is_white):
+        """Score of the position for the side to move, as the search would give it at ply 0.
+
+        Returns None unless one side has a bare king and there is a table
+        for the other side's pieces.
+        """
+        if board.castling:
+            return None
+        white, black = [], []
+        for sq in range(64):
+            piece = board.piece_at(sq)
+            if piece != "." and piece not in "Kk":
+                (white if piece.isupper() else black).append((piece.upper(), sq))
+        if white and black:
+            return None
+        wk, bk = board.kings[True], board.kings[False]
+        strong_to_move = is_white
+        if black:
+            # Swap colours by flipping ranks so the strong side is white.
+            white = [(piece, sq ^ 56) for piece, sq in black]
+            wk, bk = bk ^ 56, wk ^ 56
+            strong_to_move = not is_white
+        value = self.value(white, wk, bk, strong_to_move)
+        if not value:
+            return value
+        plies = value - 1
+        return MATE_SCORE - plies if strong_to_move else -MATE_SCORE + plies
+
+    def best_move(self, board, is_white):
+        """Return (score, move) for the best move by the tables, or None if the position is not covered."""
+        best = None
+        for move in board.generate_moves(is_white):
+            board.make_move(move)
+            score = self.probe(board, not is_white)
+            board.unmake_move(move)
+            if score is None:
+                return None
+            score = -score_from_tt(score, 1)
+            if best is None or score > best[0]:
+                best = (score, move)
+        return best
+
+
+def generate(pieces, tablebases):
+    """Build the table for the white king and pieces against a lone king by retrograde analysis.
+
+    Every subtable reached by a promotion or capture must already be open in
+    tablebases. Returns the table as a bytearray.
+    """
+    n = len(pieces)
+    size = 64 ** (n + 2)
+    weights = [64 ** (n - 1 - i) for i in range(n)]
+    bk_weight = 64 ** n
+    wtm = bytearray(size)
+    btm = bytearray(size)
+    legal_wtm = bytearray(size)
+    # Legal black moves not yet known to lose, for each black-to-move position.
+    remaining = bytearray(size)
+    # Positions resolved through a subtable, keyed by the subtable value.
+    white_events = {}
+    black_events = {}
+    mated = []
+
+    for index, (wk, bk, *squares) in enumerate(itertools.product(range(64), repeat=n + 2)):
+        occupied = 1 << wk | 1 << bk
+        for sq in squares:
+            occupied |= 1 << sq
+        if bin(occupied).count("1") != n + 2 or KING_ATTACKS[wk] >> bk & 1:
+            continue
+        if any(piece == "P" and sq // 8 in (0, 7) for piece, sq in zip(pieces, squares)):
+            continue
+        placed = list(zip(pieces, squares))
+        attacks = white_attacks(wk, placed, occupied ^ 1 << bk)
+        in_check = attacks >> bk & 1
+
+        if not in_check:
+            legal_wtm[index] = 1
+            for i, (piece, sq) in enumerate(placed):
+                if piece == "P" and sq // 8 == 1 and not occupied >> (sq - 8) & 1:
+                    for promotion in PROMOTION_PIECES:
+                        promoted = placed[:i] + [(promotion, sq - 8)] + placed[i + 1:]
+                        value = tablebases.value(promoted, wk, bk, False)
+                        if value:
+                            white_events.setdefault(value, []).append(index)
+
+        moves = 0
+        held = False
+        for target in iter_bits(KING_ATTACKS[bk] & ~attacks):
+            moves += 1
+            if occupied >> target & 1:
+                rest = [pair for pair in placed if pair[1] != target]
+                value = tablebases.value(rest, wk, target, True)
+                if value:
+                    black_events.setdefault(value, []).append(index)
+                else:
+                    held = True
+        if held or (not moves and not in_check):
+            remaining[index] = HELD
+        elif not moves:
+            btm[index] = 1
+            mated.append(index)
+        else:
+            remaining[index] = moves
+
+    frontier = mated
+    value = 1
+    while value < MAX_VALUE and (frontier or white_events or black_events):
+        found = []
+        candidates = []
+        if value % 2:
+            # Black to move and lost in value - 1 plies: every white move into
+            # one of these positions wins.
+            for index in frontier:
+                wk, rest = divmod(index, 64 * bk_weight)
+                bk, rest = divmod(rest, bk_weight)
+                squares = [rest // weight % 64 for weight in weights]
+                occupied = 1 << wk | 1 << bk
+                for sq in squares:
+                    occupied |= 1 << sq
+                for origin in iter_bits(KING_ATTACKS[wk] & ~occupied):
+                    candidates.append(index + (origin - wk) * 64 * bk_weight)
+                for piece, sq, weight in zip(pieces, squares, weights):
+                    if piece == "N":
+                        origins = KNIGHT_ATTACKS[sq] & ~occupied
+                    elif piece == "P":
+                        origins = 0
+                        if sq // 8 <= 5 and not occupied >> (sq + 8) & 1:
+                            origins = 1 << (sq + 8)
+                            if sq // 8 == 4 and not occupied >> (sq + 16) & 1:
+                                origins |= 1 << (sq + 16)
+                    else:
+                        origins = sliding_attacks(sq, occupied, SLIDING_DELTAS[piece.lower()]) & ~occupied
+                    for origin in iter_bits(origins):
+                        candidates.append(index + (origin - sq) * weight)
+            candidates.extend(white_events.pop(value, ()))
+            for index in candidates:
+                if legal_wtm[index] and not wtm[index]:
+                    wtm[index] = value + 1
+                    found.append(index)
+        else:
+            # White to move and winning: black positions whose every move
+            # leads to a known win lose one ply later.
+            for index in frontier:
+                wk = index // (64 * bk_weight)
+                bk = index // bk_weight % 64
+                occupied = 1 << wk
+                for weight in weights:
+                    occupied |= 1 << (index // weight % 64)
+                for origin in iter_bits(KING_ATTACKS[bk] & ~occupied & ~KING_ATTACKS[wk]):
+                    candidates.append(index + (origin - bk) * bk_weight)
+            candidates.extend(black_events.pop(value, ()))
+            for index in candidates:
+                left = remaining[index]
+                if btm[index] or left == 0 or left == HELD:
+                    continue
+                remaining[index] = left - 1
+                if left == 1:
+                    btm[index] = value + 1
+                    found.append(index)
+        frontier = found
+        value += 1
+    return wtm + btm
+
+
+def build(names, directory, verbose=True):
+    """Generate the named tables, and any subtables they need, into directory."""
+    os.makedirs(directory, exist_ok=True)
+    tablebases = Tablebases(directory)
+    for name in names:
+        _build(canonical_name(name), tablebases, verbose)
+    tablebases.close()
+
+
+def canonical_name(name):
+    pieces = name.upper()
+    if len(pieces) < 3 or pieces[0] != "K" or pieces[-1] != "K" or any(p not in PIECE_ORDER for p in pieces[1:-1]):
+        raise ValueError(f"Not a lone-king table: {name}")
+    return table_name(sorted(pieces[1:-1], key=PIECE_ORDER.index))
+
+
+def _build(name, tablebases, verbose):
+    if name in tablebases.tables:
+        return
+    pieces = list(name[1:-1])
+    # Subtables reached by black capturing a piece or by a promotion.
+    for i in range(len(pieces)):
+        if len(pieces) > 1:
+            _build(canonical_name("K" + "".join(pieces[:i] + pieces[i + 1:]) + "K"), tablebases, verbose)
+        if pieces[i] == "P":
+            for promotion in PROMOTION_PIECES:
+                _build(canonical_name("K" + "".join(pieces[:i] + [promotion] + pieces[i + 1:]) + "K"),
+                       tablebases, verbose)
+    start = time.perf_counter()
+    table = generate(pieces, tablebases)
+    with open(os.path.join(tablebases.directory, name + ".tb"), "wb") as output:
+        output.write(table)
+    tablebases._open(name)
+    if verbose:
+        # A white-to-move value v is a mate in v - 1 plies, which is v // 2 moves.
+        longest = max(table[:len(table) // 2]) // 2
+        print(f"{name}: {len(table)} bytes, longest mate in {longest} moves, {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate endgame tables for a king and pieces against a lone king.")
+    parser.add_argument("directory", help="directory to write .tb files to")
+    parser.add_argument("tables", nargs="*", default=["KQK", "KRK", "KPK"],
+                        help="tables to build, e.g. KQK KRK KPK; four-piece tables such as KBNK "
+                             "take a long time to generate")
+    args = parser.parse_args()
+    build(args.tables, args.directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import time
+
+from terminal import Search, board_from_fen, square_name
+
+# Tactical positions with the move that solves them, as from-square + to-square.
+# Several come from the Win At Chess (WAC) test suite; the zugzwang position
+# catches null-move pruning that trusts a pass when passing is the best move.
+TACTICAL_POSITIONS = [
+    ("back rank mate", "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - -", "d1d8"),
+    ("scholar's mate", "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq -", "f3f7"),
+    ("knight fork", "4k3/8/8/1q6/4N3/8/8/4K3 w - -", "e4d6"),
+    ("WAC.001", "2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4RK1 w - -", "g3g6"),
+    ("WAC.003", "5rk1/1ppb3p/p1pb4/6q1/3P1p1r/2P1R2P/PP1BQ1P1/5RKN w - -", "e3g3"),
+    ("WAC.004", "r1bq2rk/pp3pbp/2p1p1pQ/7P/3P4/2PB1N2/PP3PPR/2KR4 w - -", "h6h7"),
+    ("WAC.005", "5k2/6pp/p1qN4/1p1p4/3P4/2PKP2Q/PP3r2/3R4 b - -", "c6c4"),
+    ("WAC.008", "r4q1k/p2bR1rp/2p2Q1N/5p2/5p2/2P5/PP3PPP/R5K1 w - -", "e7f7"),
+    ("zugzwang", "8/8/p1p5/1p5p/1P5p/8/PPP2K1p/4R1rk w - -", "e1f1"),
+]
+
+
+def solve(fen, time_budget_ms, max_depth=64, **options):
+    """Search a position; returns (move as text, depth reached, nodes)."""
+    board, is_white = board_from_fen(fen)
+    search = Search(**options)
+    _, move, depth = search.iterative_deepening(board, is_white, time_budget_ms, max_depth)
+    return square_name(move[0]) + square_name(move[1]), depth, search.nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the engine still solves a set of tactical positions.")
+    parser.add_argument("--time-ms", type=int, default=5000, help="thinking time per position")
+    parser.add_argument("--plain", action="store_true",
+                        help="disable null-move pruning, late-move reductions and PVS")
+    args = parser.parse_args()
+
+    solved = 0
+    start = time.perf_counter()
+    for name, fen, best in TACTICAL_POSITIONS:
+        move, depth, nodes = solve(fen, args.time_ms, selective=not args.plain)
+        status = "ok" if move == best else f"FAIL (expected {best})"
+        solved += move == best
+        print(f"{name:>15}: {move} depth {depth:>2} {nodes:>8} nodes {status}")
+    print(f"Solved {solved}/{len(TACTICAL_POSITIONS)} in {time.perf_counter() - start:.1f}s")
+    if solved < len(TACTICAL_POSITIONS):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
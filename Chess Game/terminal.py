@@ -1,10 +1,16 @@
+import argparse
 import copy
+import random
+import threading
+import time
 
 PIECE_VALUES = {
     "K": 10000, "Q": 900, "R": 500, "B": 330, "N": 320, "P": 100,
     "k": -10000, "q": -900, "r": -500, "b": -330, "n": -320, "p": -100
 }
 
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -"
+
 def create_board():
     return [
         ["r", "n", "b", "q", "k", "b", "n", "r"],
@@ -18,141 +24,1057 @@ def create_board():
     ]
 
 
+# Castling rights are a bit mask: white kingside, white queenside, black
+# kingside, black queenside, in the order FEN writes them.
+CASTLING_LETTERS = "KQkq"
+ALL_CASTLING = 15
+
+
+def square_name(sq):
+    return "abcdefgh"[sq % 8] + str(8 - sq // 8)
+
+
+def parse_square(name):
+    return (8 - int(name[1])) * 8 + ord(name[0]) - ord("a")
+
+
+def parse_fen(fen):
+    """Return (squares, is_white, castling, ep_square) for a FEN string."""
+    fields = fen.split()
+    squares = []
+    for rank in fields[0].split("/"):
+        row = []
+        for char in rank:
+            if char.isdigit():
+                row.extend(["."] * int(char))
+            elif char in PIECE_VALUES:
+                row.append(char)
+            else:
+                raise ValueError(f"Invalid FEN: unknown piece {char!r} in {fen}")
+        squares.append(row)
+    if len(squares) != 8 or any(len(row) != 8 for row in squares):
+        raise ValueError(f"Invalid FEN: {fen}")
+    # The search looks up both kings, so a position without them cannot be played.
+    for king in "Kk":
+        if sum(row.count(king) for row in squares) != 1:
+            raise ValueError(f"Invalid FEN: need exactly one {king} in {fen}")
+    is_white = len(fields) < 2 or fields[1] == "w"
+    castling = 0
+    if len(fields) >= 3:
+        for bit, letter in enumerate(CASTLING_LETTERS):
+            if letter in fields[2]:
+                castling |= 1 << bit
+    ep_square = parse_square(fields[3]) if len(fields) >= 4 and fields[3] != "-" else None
+    return squares, is_white, castling, ep_square
+
+
+def board_from_fen(fen, board_class=None):
+    """Build a board from a FEN string; returns (board, is_white)."""
+    squares, is_white, castling, ep_square = parse_fen(fen)
+    board_class = board_class or ListBoard
+    return board_class(squares, is_white, castling, ep_square), is_white
+
+
+KNIGHT_OFFSETS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+KING_OFFSETS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+ROOK_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+BISHOP_DIRECTIONS = [(1, 1), (-1, -1), (1, -1), (-1, 1)]
+SLIDING_DIRECTIONS = {
+    "r": ROOK_DIRECTIONS, "b": BISHOP_DIRECTIONS, "q": ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+}
+
+
+# Zobrist keys come from a fixed seed so hashes are the same in every run.
+_zobrist_random = random.Random(2024)
+ZOBRIST_PIECES = {
+    piece: [_zobrist_random.getrandbits(64) for _ in range(64)] for piece in PIECE_VALUES
+}
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+ZOBRIST_CASTLING = [_zobrist_random.getrandbits(64) for _ in range(16)]
+ZOBRIST_EN_PASSANT = [_zobrist_random.getrandbits(64) for _ in range(8)]
+
+
+def zobrist_hash(board, is_white=True):
+    key = 0 if is_white else ZOBRIST_BLACK_TO_MOVE
+    for sq in range(64):
+        piece = board.piece_at(sq)
+        if piece != ".":
+            key ^= ZOBRIST_PIECES[piece][sq]
+    key ^= ZOBRIST_CASTLING[board.castling]
+    if board.ep_square is not None:
+        key ^= ZOBRIST_EN_PASSANT[board.ep_square % 8]
+    return key
+
+
+# Piece-square tables from white's point of view, laid out like the board
+# (a8 first, h1 last). Black pieces use the table mirrored top to bottom.
+PAWN_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    10,  10,  20,  30,  30,  20,  10,  10,
+     5,   5,  10,  25,  25,  10,   5,   5,
+     0,   0,   0,  20,  20,   0,   0,   0,
+     5,  -5, -10,   0,   0, -10,  -5,   5,
+     5,  10,  10, -20, -20,  10,  10,   5,
+     0,   0,   0,   0,   0,   0,   0,   0,
+]
+PAWN_ENDGAME_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+    80,  80,  80,  80,  80,  80,  80,  80,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    30,  30,  30,  30,  30,  30,  30,  30,
+    15,  15,  15,  15,  15,  15,  15,  15,
+     5,   5,   5,   5,   5,   5,   5,   5,
+     0,   0,   0,   0,   0,   0,   0,   0,
+     0,   0,   0,   0,   0,   0,   0,   0,
+]
+KNIGHT_TABLE = [
+   -50, -40, -30, -30, -30, -30, -40, -50,
+   -40, -20,   0,   0,   0,   0, -20, -40,
+   -30,   0,  10,  15,  15,  10,   0, -30,
+   -30,   5,  15,  20,  20,  15,   5, -30,
+   -30,   0,  15,  20,  20,  15,   0, -30,
+   -30,   5,  10,  15,  15,  10,   5, -30,
+   -40, -20,   0,   5,   5,   0, -20, -40,
+   -50, -40, -30, -30, -30, -30, -40, -50,
+]
+BISHOP_TABLE = [
+   -20, -10, -10, -10, -10, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,  10,  10,   5,   0, -10,
+   -10,   5,   5,  10,  10,   5,   5, -10,
+   -10,   0,  10,  10,  10,  10,   0, -10,
+   -10,  10,  10,  10,  10,  10,  10, -10,
+   -10,   5,   0,   0,   0,   0,   5, -10,
+   -20, -10, -10, -10, -10, -10, -10, -20,
+]
+ROOK_TABLE = [
+     0,   0,   0,   0,   0,   0,   0,   0,
+     5,  10,  10,  10,  10,  10,  10,   5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+    -5,   0,   0,   0,   0,   0,   0,  -5,
+     0,   0,   0,   5,   5,   0,   0,   0,
+]
+QUEEN_TABLE = [
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+   -10,   0,   0,   0,   0,   0,   0, -10,
+   -10,   0,   5,   5,   5,   5,   0, -10,
+    -5,   0,   5,   5,   5,   5,   0,  -5,
+     0,   0,   5,   5,   5,   5,   0,  -5,
+   -10,   5,   5,   5,   5,   5,   0, -10,
+   -10,   0,   5,   0,   0,   0,   0, -10,
+   -20, -10, -10,  -5,  -5, -10, -10, -20,
+]
+KING_TABLE = [
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -30, -40, -40, -50, -50, -40, -40, -30,
+   -20, -30, -30, -40, -40, -30, -30, -20,
+   -10, -20, -20, -20, -20, -20, -20, -10,
+    20,  20,   0,   0,   0,   0,  20,  20,
+    20,  30,  10,   0,   0,  10,  30,  20,
+]
+KING_ENDGAME_TABLE = [
+   -50, -40, -30, -20, -20, -30, -40, -50,
+   -30, -20, -10,   0,   0, -10, -20, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  30,  40,  40,  30, -10, -30,
+   -30, -10,  20,  30,  30,  20, -10, -30,
+   -30, -30,   0,   0,   0,   0, -30, -30,
+   -50, -30, -30, -30, -30, -30, -30, -50,
+]
+# (midgame, endgame) table for each piece type.
+PIECE_SQUARE_TABLES = {
+    "P": (PAWN_TABLE, PAWN_ENDGAME_TABLE),
+    "N": (KNIGHT_TABLE, KNIGHT_TABLE),
+    "B": (BISHOP_TABLE, BISHOP_TABLE),
+    "R": (ROOK_TABLE, ROOK_TABLE),
+    "Q": (QUEEN_TABLE, QUEEN_TABLE),
+    "K": (KING_TABLE, KING_ENDGAME_TABLE),
+}
+
+# The game phase runs from MIDGAME_PHASE with all minor and major pieces on
+# the board down to 0 with only kings and pawns left.
+MIDGAME_PHASE = 24
+PHASE_WEIGHTS = {piece: {"n": 1, "b": 1, "r": 2, "q": 4}.get(piece.lower(), 0) for piece in PIECE_VALUES}
+
+
+def _square_scores(stage):
+    """PIECE_VALUES plus the piece-square bonus, signed for white, per piece and square."""
+    scores = {}
+    for piece, value in PIECE_VALUES.items():
+        table = PIECE_SQUARE_TABLES[piece.upper()][stage]
+        if piece.isupper():
+            scores[piece] = [value + table[sq] for sq in range(64)]
+        else:
+            scores[piece] = [value - table[sq ^ 56] for sq in range(64)]
+    return scores
+
+
+MIDGAME_SCORES = _square_scores(0)
+ENDGAME_SCORES = _square_scores(1)
+
+
+def evaluation_terms(board):
+    """Return (midgame score, endgame score, phase) for a whole board."""
+    midgame = endgame = phase = 0
+    for sq in range(64):
+        piece = board.piece_at(sq)
+        if piece != ".":
+            midgame += MIDGAME_SCORES[piece][sq]
+            endgame += ENDGAME_SCORES[piece][sq]
+            phase += PHASE_WEIGHTS[piece]
+    return midgame, endgame, phase
+
+
+def tapered_score(midgame, endgame, phase):
+    """Blend midgame and endgame scores by how much material is left."""
+    phase = min(phase, MIDGAME_PHASE)
+    return (midgame * phase + endgame * (MIDGAME_PHASE - phase)) // MIDGAME_PHASE
+
+
 def print_board(board):
     print("\n  a b c d e f g h")
-    for i, row in enumerate(board):
-        print(8 - i, " ".join(row), 8 - i)
+    for row in range(8):
+        pieces = [board.piece_at(row * 8 + col) for col in range(8)]
+        print(8 - row, " ".join(pieces), 8 - row)
     print("  a b c d e f g h\n")
 
-def evaluate_board(board):
-    score = 0
-    for row in board:
-        for piece in row:
-            if piece in PIECE_VALUES:
-                score += PIECE_VALUES[piece]
+# Castling rights that survive a move from or to each square.
+CASTLING_MASKS = [ALL_CASTLING] * 64
+CASTLING_MASKS[60] &= ~3
+CASTLING_MASKS[63] &= ~1
+CASTLING_MASKS[56] &= ~2
+CASTLING_MASKS[4] &= ~12
+CASTLING_MASKS[7] &= ~4
+CASTLING_MASKS[0] &= ~8
+# Rook (from, to) squares for each castling king destination.
+CASTLING_ROOKS = {62: (63, 61), 58: (56, 59), 6: (7, 5), 2: (0, 3)}
+PROMOTIONS = {True: "QRBN", False: "qrbn"}
+
+
+# A move is a tuple (from_square, to_square, captured, promotion) where squares
+# are indexes row * 8 + col, captured is the piece taken ("." if none) and
+# promotion is the piece a pawn turns into, or None. Castling is the king
+# moving two squares and en passant is a pawn capturing onto ep_square.
+class Board:
+    """Move making shared by the board backends.
+
+    Subclasses store the pieces and provide piece_at, _place, _clear,
+    generate_pseudo_moves and is_attacked; this class keeps castling rights,
+    the en passant square, king squares, the Zobrist hash and the incremental
+    evaluation in step with them.
+    """
+
+    def _init_state(self, is_white, castling, ep_square):
+        self.castling = castling
+        self.ep_square = ep_square
+        self.history = []
+        self.kings = {}
+        for sq in range(64):
+            if self.piece_at(sq) in ("K", "k"):
+                self.kings[self.piece_at(sq) == "K"] = sq
+        self.hash = zobrist_hash(self, is_white)
+        self.midgame, self.endgame, self.phase = evaluation_terms(self)
+        self.piece_count = sum(self.piece_at(sq) != "." for sq in range(64))
+
+    def _add(self, sq, piece):
+        self._place(sq, piece)
+        self.piece_count += 1
+        self.hash ^= ZOBRIST_PIECES[piece][sq]
+        self.midgame += MIDGAME_SCORES[piece][sq]
+        self.endgame += ENDGAME_SCORES[piece][sq]
+        self.phase += PHASE_WEIGHTS[piece]
+
+    def _remove(self, sq, piece):
+        self._clear(sq, piece)
+        self.piece_count -= 1
+        self.hash ^= ZOBRIST_PIECES[piece][sq]
+        self.midgame -= MIDGAME_SCORES[piece][sq]
+        self.endgame -= ENDGAME_SCORES[piece][sq]
+        self.phase -= PHASE_WEIGHTS[piece]
+
+    def _state_hash(self):
+        key = ZOBRIST_CASTLING[self.castling]
+        if self.ep_square is not None:
+            key ^= ZOBRIST_EN_PASSANT[self.ep_square % 8]
+        return key
+
+    def evaluate(self):
+        return tapered_score(self.midgame, self.endgame, self.phase)
+
+    def in_check(self, is_white):
+        return self.is_attacked(self.kings[is_white], not is_white)
+
+    def generate_moves(self, is_white):
+        """Legal moves: pseudo-legal moves that do not leave the king in check."""
+        moves = []
+        for move in self.generate_pseudo_moves(is_white):
+            self.make_move(move)
+            if not self.in_check(is_white):
+                moves.append(move)
+            self.unmake_move(move)
+        return moves
+
+    def make_null_move(self):
+        """Pass the turn to the other side, for null-move pruning."""
+        self.history.append((self.castling, self.ep_square))
+        self.hash ^= ZOBRIST_BLACK_TO_MOVE ^ self._state_hash()
+        self.ep_square = None
+        self.hash ^= self._state_hash()
+
+    def unmake_null_move(self):
+        self.hash ^= self._state_hash()
+        self.castling, self.ep_square = self.history.pop()
+        self.hash ^= ZOBRIST_BLACK_TO_MOVE ^ self._state_hash()
+
+    def generate_captures(self, is_white):
+        """Pseudo-legal captures and promotions, for the quiescence search."""
+        return [move for move in self.generate_pseudo_moves(is_white) if move[2] != "." or move[3]]
+
+    def _castling_moves(self, is_white, moves):
+        king_sq, kingside, queenside = (60, 1, 2) if is_white else (4, 4, 8)
+        if not self.castling & (kingside | queenside) or self.is_attacked(king_sq, not is_white):
+            return
+        if (self.castling & kingside and self.piece_at(king_sq + 1) == "." and self.piece_at(king_sq + 2) == "."
+                and not self.is_attacked(king_sq + 1, not is_white)
+                and not self.is_attacked(king_sq + 2, not is_white)):
+            moves.append((king_sq, king_sq + 2, ".", None))
+        if (self.castling & queenside and self.piece_at(king_sq - 1) == "." and self.piece_at(king_sq - 2) == "."
+                and self.piece_at(king_sq - 3) == "."
+                and not self.is_attacked(king_sq - 1, not is_white)
+                and not self.is_attacked(king_sq - 2, not is_white)):
+            moves.append((king_sq, king_sq - 2, ".", None))
+
+    def make_move(self, move):
+        from_sq, to_sq, captured, promotion = move
+        piece = self.piece_at(from_sq)
+        kind = piece.lower()
+        self.history.append((self.castling, self.ep_square))
+        self.hash ^= ZOBRIST_BLACK_TO_MOVE ^ self._state_hash()
+
+        if captured != ".":
+            if kind == "p" and to_sq == self.ep_square:
+                self._remove(to_sq + 8 if piece == "P" else to_sq - 8, captured)
+            else:
+                self._remove(to_sq, captured)
+        self._remove(from_sq, piece)
+        self._add(to_sq, promotion or piece)
+
+        self.ep_square = None
+        if kind == "k":
+            self.kings[piece == "K"] = to_sq
+            if abs(to_sq - from_sq) == 2:
+                rook_from, rook_to = CASTLING_ROOKS[to_sq]
+                rook = self.piece_at(rook_from)
+                self._remove(rook_from, rook)
+                self._add(rook_to, rook)
+        elif kind == "p" and abs(to_sq - from_sq) == 16:
+            self.ep_square = (from_sq + to_sq) // 2
+        self.castling &= CASTLING_MASKS[from_sq] & CASTLING_MASKS[to_sq]
+        self.hash ^= self._state_hash()
+
+    def unmake_move(self, move):
+        from_sq, to_sq, captured, promotion = move
+        moved = self.piece_at(to_sq)
+        piece = ("P" if moved.isupper() else "p") if promotion else moved
+        kind = piece.lower()
+        self.hash ^= self._state_hash()
+        self.castling, self.ep_square = self.history.pop()
+        self.hash ^= ZOBRIST_BLACK_TO_MOVE ^ self._state_hash()
+
+        if kind == "k":
+            self.kings[piece == "K"] = from_sq
+            if abs(to_sq - from_sq) == 2:
+                rook_from, rook_to = CASTLING_ROOKS[to_sq]
+                rook = self.piece_at(rook_to)
+                self._remove(rook_to, rook)
+                self._add(rook_from, rook)
+        self._remove(to_sq, moved)
+        self._add(from_sq, piece)
+        if captured != ".":
+            if kind == "p" and to_sq == self.ep_square:
+                self._add(to_sq + 8 if piece == "P" else to_sq - 8, captured)
+            else:
+                self._add(to_sq, captured)
+
+
+class ListBoard(Board):
+    """Board backend that keeps the 8x8 list of strings from create_board()."""
+
+    def __init__(self, squares=None, is_white=True, castling=ALL_CASTLING, ep_square=None):
+        self.squares = squares if squares is not None else create_board()
+        self._init_state(is_white, castling, ep_square)
+
+    def piece_at(self, sq):
+        return self.squares[sq // 8][sq % 8]
+
+    def _place(self, sq, piece):
+        self.squares[sq // 8][sq % 8] = piece
+
+    def _clear(self, sq, piece):
+        self.squares[sq // 8][sq % 8] = "."
+
+    def is_attacked(self, sq, by_white):
+        """Whether any piece of the given side attacks square sq."""
+        board = self.squares
+        row, col = divmod(sq, 8)
+        pawn_row = row + 1 if by_white else row - 1
+        pawn = "P" if by_white else "p"
+        if 0 <= pawn_row < 8:
+            for dc in (-1, 1):
+                if 0 <= col + dc < 8 and board[pawn_row][col + dc] == pawn:
+                    return True
+        for offsets, kind in ((KNIGHT_OFFSETS, "n"), (KING_OFFSETS, "k")):
+            attacker = kind.upper() if by_white else kind
+            for dr, dc in offsets:
+                if 0 <= row + dr < 8 and 0 <= col + dc < 8 and board[row + dr][col + dc] == attacker:
+                    return True
+        for directions, kinds in ((ROOK_DIRECTIONS, "rq"), (BISHOP_DIRECTIONS, "bq")):
+            attackers = kinds.upper() if by_white else kinds
+            for dr, dc in directions:
+                new_row, new_col = row + dr, col + dc
+                while 0 <= new_row < 8 and 0 <= new_col < 8:
+                    target = board[new_row][new_col]
+                    if target != ".":
+                        if target in attackers:
+                            return True
+                        break
+                    new_row, new_col = new_row + dr, new_col + dc
+        return False
+
+    def has_non_pawn_material(self, is_white):
+        pieces = "NBRQ" if is_white else "nbrq"
+        return any(piece in pieces for row in self.squares for piece in row)
+
+    def generate_pseudo_moves(self, is_white):
+        moves = []
+        for row in range(8):
+            for col in range(8):
+                piece = self.squares[row][col]
+                if (is_white and piece.isupper()) or (not is_white and piece.islower()):
+                    if piece.lower() == 'p':
+                        moves.extend(self.generate_pawn_moves(row, col, piece))
+                    else:
+                        moves.extend(self.generate_piece_moves(row, col, piece))
+        self._castling_moves(is_white, moves)
+        return moves
+
+    def generate_pawn_moves(self, row, col, piece):
+        board = self.squares
+        moves = []
+        direction = -1 if piece.isupper() else 1
+        start_row = 6 if piece.isupper() else 1
+        last_row = 0 if piece.isupper() else 7
+        promotions = PROMOTIONS[piece.isupper()] if row + direction == last_row else [None]
+        from_sq = row * 8 + col
+
+
+        if board[row + direction][col] == ".":
+            for promotion in promotions:
+                moves.append((from_sq, (row + direction) * 8 + col, ".", promotion))
+
+
+            if row == start_row and board[row + 2 * direction][col] == ".":
+                moves.append((from_sq, (row + 2 * direction) * 8 + col, ".", None))
+
+
+        for dc in [-1, 1]:
+            if 0 <= col + dc < 8:
+                to_sq = (row + direction) * 8 + col + dc
+                target = board[row + direction][col + dc]
+                if target != "." and target.islower() != piece.islower():  # Enemy piece
+                    for promotion in promotions:
+                        moves.append((from_sq, to_sq, target, promotion))
+                elif to_sq == self.ep_square:
+                    moves.append((from_sq, to_sq, "p" if piece.isupper() else "P", None))
+        return moves
+
+    def generate_piece_moves(self, row, col, piece):
+        board = self.squares
+        moves = []
+        kind = piece.lower()
+        if kind in SLIDING_DIRECTIONS:
+            directions, slides = SLIDING_DIRECTIONS[kind], True
+        else:
+            directions, slides = (KNIGHT_OFFSETS if kind == "n" else KING_OFFSETS), False
+        for dr, dc in directions:
+            new_row, new_col = row + dr, col + dc
+            while 0 <= new_row < 8 and 0 <= new_col < 8:
+                target = board[new_row][new_col]
+                if target == "." or target.islower() != piece.islower():
+                    moves.append((row * 8 + col, new_row * 8 + new_col, target, None))
+                if target != "." or not slides:
+                    break
+                new_row, new_col = new_row + dr, new_col + dc
+        return moves
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+class TranspositionTable:
+    """Fixed-size table of search results indexed by the low bits of the Zobrist hash.
+
+    Each slot holds (key, depth, score, bound, best_move, generation). A slot is
+    overwritten unless it holds a deeper result for a different position from
+    the current search, so memory stays at `size` entries however long the game.
+    """
+
+    def __init__(self, size=1 << 18):
+        self.mask = size - 1
+        self.entries = [None] * size
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        index = key & self.mask
+        old = self.entries[index]
+        if old is not None and old[0] != key and old[5] == self.generation and old[1] > depth:
+            return
+        self.entries[index] = (key, depth, score, bound, move, self.generation)
+
+
+MAX_PLY = 128
+# Mate scores count down with the distance to mate so shorter mates score higher.
+MATE_SCORE = 1000000
+
+
+def score_to_tt(score, ply):
+    """Store mate scores relative to the node rather than the root."""
+    if score > MATE_SCORE - MAX_PLY:
+        return score + ply
+    if score < -MATE_SCORE + MAX_PLY:
+        return score - ply
     return score
 
-def generate_moves(board, is_white):
-    moves = []
-    for row in range(8):
-        for col in range(8):
-            piece = board[row][col]
-            if (is_white and piece.isupper()) or (not is_white and piece.islower()):
-                if piece.lower() == 'p':
-                    moves.extend(generate_pawn_moves(board, row, col, piece))
-                else:
-                    moves.extend(generate_piece_moves(board, row, col, piece))
-    return moves
-
-def generate_pawn_moves(board, row, col, piece):
-    moves = []
-    direction = -1 if piece.isupper() else 1
-    start_row = 6 if piece.isupper() else 1  
-
-
-    if board[row + direction][col] == ".":
-        new_board = copy.deepcopy(board)
-        new_board[row + direction][col] = piece
-        new_board[row][col] = "."
-        moves.append(new_board)
-
-
-        if row == start_row and board[row + 2 * direction][col] == ".":
-            new_board = copy.deepcopy(board)
-            new_board[row + 2 * direction][col] = piece
-            new_board[row][col] = "."
-            moves.append(new_board)
-
-
-    for dc in [-1, 1]:
-        if 0 <= col + dc < 8 and board[row + direction][col + dc] != ".":
-            if board[row + direction][col + dc].islower() != piece.islower():  # Enemy piece
-                new_board = copy.deepcopy(board)
-                new_board[row + direction][col + dc] = piece
-                new_board[row][col] = "."
-                moves.append(new_board)
-    return moves
-
-def generate_piece_moves(board, row, col, piece):
-    moves = []
-    directions = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
-    for dr, dc in directions:
-        new_row, new_col = row + dr, col + dc
-        if 0 <= new_row < 8 and 0 <= new_col < 8:
-            if board[new_row][new_col] == "." or board[new_row][new_col].islower() != piece.islower():
-                new_board = copy.deepcopy(board)
-                new_board[new_row][new_col] = piece
-                new_board[row][col] = "."
-                moves.append(new_board)
-    return moves
-
-def minimax(board, depth, is_maximizing, alpha, beta):
-    if depth == 0:
-        return evaluate_board(board), board
-
-    best_move = None
 
-    if is_maximizing:
-        max_eval = float("-inf")
-        for move in generate_moves(board, True):
-            eval, _ = minimax(move, depth - 1, False, alpha, beta)
-            if eval > max_eval:
-                max_eval = eval
+def score_from_tt(score, ply):
+    if score > MATE_SCORE - MAX_PLY:
+        return score - ply
+    if score < -MATE_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+# Move ordering scores: the hash/PV move first, then captures by most valuable
+# victim / least valuable attacker, then killer moves, then quiet moves by history.
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 24
+KILLER_SCORE = 1 << 20
+# Safety margin for delta pruning in the quiescence search.
+DELTA_MARGIN = 200
+# Null-move pruning: minimum depth (below it the reduced search drops straight
+# into quiescence and misses quiet mate threats) and depth reduction. At or below
+# SELECTIVE_MIN_PHASE (a rook each and pawns, say) zugzwang is too common to
+# pass at all; up to VERIFICATION_PHASE a null-move cutoff is only trusted
+# once a reduced search of the real moves, with no passing anywhere below
+# it, agrees.
+NULL_MOVE_MIN_DEPTH = 4
+NULL_MOVE_REDUCTION = 2
+SELECTIVE_MIN_PHASE = 6
+VERIFICATION_PHASE = 12
+# Late-move reductions: quiet moves after the first few are searched one ply
+# shallower, and two plies shallower further down the list. They are also
+# off in PV nodes, and at or below SELECTIVE_MIN_PHASE, where a quiet
+# waiting move is often the only good one.
+LMR_MIN_DEPTH = 3
+LMR_FULL_DEPTH_MOVES = 3
+LMR_DEEP_REDUCTION_MOVES = 6
+
+
+class Search:
+    """Alpha-beta search state shared between the nodes of one or more searches.
+
+    Scores inside the search are from the side to move's point of view.
+    """
+
+    def __init__(self, tt=None, ordering=True, quiescence=True, selective=True, stats=None, tablebases=None):
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.ordering = ordering
+        self.use_quiescence = quiescence
+        self.selective = selective
+        # Optional collector (see stats.SearchStats) told about every finished depth.
+        self.stats = stats
+        # Optional tablebase.Tablebases probed instead of searching small endgames.
+        self.tablebases = tablebases
+        self.nodes = 0
+        self.quiescence_nodes = 0
+        self.quiescence_time = 0.0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_hits = 0
+        # Nesting depth of null-move verification searches; no null moves inside them.
+        self.verifying = 0
+        self.deadline = None
+        self.stopped = False
+        self.pv_moves = {}
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {}
+
+    def new_search(self):
+        """Reset per-search state; the transposition table and history carry over."""
+        self.tt.new_search()
+        self.stopped = False
+        self.pv_moves = {}
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        # Halve old history scores so they fade instead of dominating later positions.
+        self.history = {key: value // 2 for key, value in self.history.items() if value > 1}
+
+    def order_moves(self, board, moves, ply, hash_moves):
+        killers = self.killers[ply]
+        history = self.history
+
+        def score(move):
+            if move in hash_moves:
+                return HASH_MOVE_SCORE
+            from_sq, to_sq, captured, promotion = move
+            if captured != ".":
+                victim = abs(PIECE_VALUES[captured])
+                attacker = abs(PIECE_VALUES[board.piece_at(from_sq)])
+                return CAPTURE_SCORE + victim * 16 - attacker // 100
+            if promotion:
+                return CAPTURE_SCORE
+            if move == killers[0]:
+                return KILLER_SCORE + 1
+            if move == killers[1]:
+                return KILLER_SCORE
+            return history.get((from_sq, to_sq), 0)
+
+        moves.sort(key=score, reverse=True)
+
+    def record_cutoff(self, move, depth, ply):
+        """Remember a quiet move that caused a beta cutoff as a killer and in the history."""
+        if move[2] != "." or move[3]:
+            return
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        key = (move[0], move[1])
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+    def negamax(self, board, depth, alpha, beta, is_white, ply=0, allow_null=True):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % 1024 == 0 and time.perf_counter() > self.deadline:
+            self.stopped = True
+        if self.stopped:
+            return 0, None
+
+        if (self.tablebases is not None and ply > 0
+                and board.piece_count <= self.tablebases.max_pieces):
+            score = self.tablebases.probe(board, is_white)
+            if score is not None:
+                return score_from_tt(score, ply), None
+
+        tt_move = None
+        if depth > 0:
+            entry = self.tt.probe(board.hash)
+            if entry is not None:
+                self.tt_hits += 1
+                _, entry_depth, score, bound, tt_move, _ = entry
+                score = score_from_tt(score, ply)
+                if entry_depth >= depth and (
+                    bound == EXACT
+                    or (bound == LOWER_BOUND and score >= beta)
+                    or (bound == UPPER_BOUND and score <= alpha)
+                ):
+                    return score, tt_move
+
+        if depth == 0:
+            if not self.use_quiescence:
+                score = board.evaluate()
+                return (score if is_white else -score), None
+            start = time.perf_counter()
+            score = self.quiescence(board, alpha, beta, is_white)
+            self.quiescence_time += time.perf_counter() - start
+            return score, None
+
+        in_check = board.in_check(is_white)
+        pv_node = beta - alpha > 1
+        if (self.selective and allow_null and not self.verifying and not pv_node and not in_check
+                and depth >= NULL_MOVE_MIN_DEPTH and board.phase > SELECTIVE_MIN_PHASE
+                and board.has_non_pawn_material(is_white)):
+            score = self.null_move_search(board, depth, beta, is_white, ply)
+            if self.stopped:
+                return 0, None
+            if score is not None:
+                return score, None
+
+        moves = board.generate_pseudo_moves(is_white)
+        if self.ordering:
+            self.order_moves(board, moves, ply, (tt_move, self.pv_moves.get(board.hash)))
+        else:
+            for first in (tt_move, self.pv_moves.get(board.hash)):
+                if first in moves:
+                    moves.remove(first)
+                    moves.insert(0, first)
+
+        alpha_orig = alpha
+        best_score = float("-inf")
+        best_move = None
+        legal_moves = 0
+        killers = self.killers[ply]
+        for move in moves:
+            board.make_move(move)
+            if board.in_check(is_white):
+                board.unmake_move(move)
+                continue
+            legal_moves += 1
+            if legal_moves == 1 or not self.selective:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, not is_white, ply + 1)[0]
+            else:
+                # Principal variation search: later moves only have to prove they
+                # are no better than alpha, which a zero-width window does cheaply.
+                reduction = 0
+                if (depth >= LMR_MIN_DEPTH and legal_moves > LMR_FULL_DEPTH_MOVES and not in_check
+                        and board.phase > SELECTIVE_MIN_PHASE and not pv_node
+                        and move[2] == "." and not move[3] and move not in killers
+                        and not board.in_check(not is_white)):
+                    reduction = 1 if legal_moves <= LMR_DEEP_REDUCTION_MOVES else 2
+                score = -self.negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, not is_white, ply + 1)[0]
+                if score > alpha and reduction:
+                    score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, not is_white, ply + 1)[0]
+                if alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, not is_white, ply + 1)[0]
+            board.unmake_move(move)
+            if self.stopped:
+                return 0, None
+            if score > best_score:
+                best_score = score
                 best_move = move
-            alpha = max(alpha, eval)
-            if beta <= alpha:
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self.beta_cutoffs += 1
+                if legal_moves == 1:
+                    self.first_move_cutoffs += 1
+                if self.ordering:
+                    self.record_cutoff(move, depth, ply)
                 break
-        return max_eval, best_move
-    else:
-        min_eval = float("inf")
-        for move in generate_moves(board, False):
-            eval, _ = minimax(move, depth - 1, True, alpha, beta)
-            if eval < min_eval:
-                min_eval = eval
-                best_move = move
-            beta = min(beta, eval)
-            if beta <= alpha:
+
+        if best_move is None:
+            # No legal move: checkmate, or stalemate if the king is not attacked.
+            return (-MATE_SCORE + ply if in_check else 0), None
+
+        if best_score <= alpha_orig:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.tt.store(board.hash, depth, score_to_tt(best_score, ply), bound, best_move)
+        return best_score, best_move
+
+    def null_move_search(self, board, depth, beta, is_white, ply):
+        """Let the opponent move twice; if we still beat beta the node can be pruned.
+
+        Returns a score to cut off with, or None to search the node normally.
+        With little material left zugzwang is common and passing would be
+        the best move, so a fail high there is verified by a reduced search
+        of the real moves, with null moves off throughout, before it is
+        trusted.
+        """
+        static = board.evaluate()
+        if (static if is_white else -static) < beta:
+            return None
+        reduction = NULL_MOVE_REDUCTION + (1 if depth > 6 else 0)
+        board.make_null_move()
+        score = -self.negamax(board, max(depth - 1 - reduction, 0), -beta, -beta + 1, not is_white,
+                              ply + 1, allow_null=False)[0]
+        board.unmake_null_move()
+        if self.stopped or score < beta:
+            return None
+        if score >= MATE_SCORE - MAX_PLY:
+            score = beta
+        if board.phase <= VERIFICATION_PHASE:
+            self.verifying += 1
+            verified = self.negamax(board, depth - 1, beta - 1, beta, is_white, ply,
+                                    allow_null=False)[0]
+            self.verifying -= 1
+            if self.stopped or verified < beta:
+                return None
+        return score
+
+    def quiescence(self, board, alpha, beta, is_white):
+        """Search captures and promotions only until the position is quiet.
+
+        The side to move may always stand pat on the static evaluation, and
+        captures that cannot lift the score back to alpha even with a margin
+        (delta pruning) are skipped.
+        """
+        self.nodes += 1
+        self.quiescence_nodes += 1
+        if self.deadline is not None and self.nodes % 1024 == 0 and time.perf_counter() > self.deadline:
+            self.stopped = True
+        if self.stopped:
+            return 0
+
+        stand_pat = board.evaluate()
+        if not is_white:
+            stand_pat = -stand_pat
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat + DELTA_MARGIN + abs(PIECE_VALUES["Q"]) < alpha:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        moves = board.generate_captures(is_white)
+        moves.sort(key=lambda move: (abs(PIECE_VALUES[move[2]]) if move[2] != "." else 0,
+                                     -abs(PIECE_VALUES[board.piece_at(move[0])])), reverse=True)
+        best_score = stand_pat
+        for move in moves:
+            captured, promotion = move[2], move[3]
+            if not promotion and stand_pat + abs(PIECE_VALUES[captured]) + DELTA_MARGIN <= alpha:
+                continue
+            board.make_move(move)
+            if board.in_check(is_white):
+                board.unmake_move(move)
+                continue
+            score = -self.quiescence(board, -beta, -alpha, not is_white)
+            board.unmake_move(move)
+            if self.stopped:
+                return 0
+            if score > best_score:
+                best_score = score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best_score
+
+    def principal_variation(self, board, is_white, max_length):
+        """Follow best moves through the transposition table from board."""
+        pv = []
+        seen = set()
+        while len(pv) < max_length and board.hash not in seen:
+            seen.add(board.hash)
+            entry = self.tt.probe(board.hash)
+            if entry is None or entry[4] not in board.generate_moves(is_white):
+                break
+            pv.append(entry[4])
+            board.make_move(entry[4])
+            is_white = not is_white
+        for move in reversed(pv):
+            board.unmake_move(move)
+        return pv
+
+    def iterative_deepening(self, board, is_white, time_budget_ms, max_depth=64, report=None):
+        """Search depth 1, 2, 3, ... until time_budget_ms runs out.
+
+        Returns (score, move, depth) from the last depth that finished, with the
+        score from white's point of view. Each iteration searches the previous
+        iteration's principal variation first.
+
+        A time_budget_ms of None searches until max_depth, or until another
+        thread sets stopped. If given, report(depth, score, pv) is called after
+        each finished depth with the score from the side to move's point of view.
+        """
+        start = time.perf_counter()
+        self.new_search()
+        if self.tablebases is not None and board.piece_count <= self.tablebases.max_pieces:
+            found = self.tablebases.best_move(board, is_white)
+            if found is not None:
+                score, move = found
+                if report is not None:
+                    report(1, score, [move])
+                return (score if is_white else -score), move, 1
+        if self.stats is not None:
+            self.stats.begin(self)
+        result = (0, None, 0)
+        for depth in range(1, max_depth + 1):
+            # Depth 1 always runs to completion so there is a move to play.
+            if time_budget_ms is not None and depth > 1:
+                self.deadline = start + time_budget_ms / 1000
+            score, move = self.negamax(board, depth, float("-inf"), float("inf"), is_white)
+            if self.stopped or move is None:
+                break
+            result = (score if is_white else -score, move, depth)
+
+            self.pv_moves = {}
+            pv = self.principal_variation(board, is_white, depth)
+            for pv_move in pv:
+                self.pv_moves[board.hash] = pv_move
+                board.make_move(pv_move)
+            for pv_move in reversed(pv):
+                board.unmake_move(pv_move)
+            if report is not None:
+                report(depth, score, pv)
+            if self.stats is not None:
+                self.stats.record_depth(self, depth, score, pv)
+
+            # A deeper iteration that cannot finish in the time left is wasted work.
+            if time_budget_ms is not None and time.perf_counter() - start > time_budget_ms / 2000:
                 break
-        return min_eval, best_move
+        self.deadline = None
+        return result
+
+
+class Ponderer:
+    """Searches the expected reply on a background thread while the player thinks.
+
+    The reply is the next move of the principal variation. On a ponder hit the
+    running search is given a deadline and its result used; on a miss it is
+    stopped, keeping what it stored in the shared transposition table.
+    """
+
+    def __init__(self, search):
+        self.search = search
+        self.thread = None
+        self.predicted = None
+        self.result = None
+
+    def start(self, board, is_white):
+        pv = self.search.principal_variation(board, is_white, 1)
+        if not pv:
+            return
+        self.predicted = pv[0]
+        # The player's move is made on the real board, so ponder on a copy.
+        ponder_board = copy.deepcopy(board)
+        ponder_board.make_move(self.predicted)
+        self.result = None
+        self.thread = threading.Thread(target=self._run, args=(ponder_board, not is_white), daemon=True)
+        self.thread.start()
+
+    def _run(self, board, is_white):
+        self.result = self.search.iterative_deepening(board, is_white, None)
+
+    def finish(self, move, time_budget_ms):
+        """Returns the (score, move, depth) search result if move was predicted, else None."""
+        thread, self.thread = self.thread, None
+        if thread is None:
+            return None
+        if move == self.predicted:
+            # Without a time budget iterative_deepening never touches the deadline.
+            self.search.deadline = time.perf_counter() + time_budget_ms / 1000
+            thread.join()
+            return self.result
+        # The search clears stopped when it starts, so keep setting it until the thread ends.
+        while thread.is_alive():
+            self.search.stopped = True
+            thread.join(0.01)
+        return None
+
+
+def minimax(board, depth, is_maximizing, alpha, beta, tt=None):
+    """Search for the best move; scores are from white's point of view.
+
+    Pass the same TranspositionTable on every call to reuse earlier searches.
+    """
+    search = Search(tt)
+    search.new_search()
+    if is_maximizing:
+        return search.negamax(board, depth, alpha, beta, True)
+    score, move = search.negamax(board, depth, -beta, -alpha, False)
+    return -score, move
 
 
 def player_move(board):
+    legal_moves = board.generate_moves(True)
     while True:
         try:
-            print("Enter your move (e.g., 'e2 e4'):")
+            print("Enter your move (e.g., 'e2 e4', or 'e7 e8n' to promote to a knight):")
             move = input("Move: ").strip().lower()
-            if len(move) != 5 or move[2] != " ":
+            if len(move) not in (5, 6) or move[2] != " ":
                 raise ValueError("Invalid format. Use 'e2 e4'.")
-            
-            start, end = move.split()
-            start_col, start_row = ord(start[0]) - ord('a'), 8 - int(start[1])
-            end_col, end_row = ord(end[0]) - ord('a'), 8 - int(end[1])
 
-            piece = board[start_row][start_col]
+            start, end = move[:2], move[3:5]
+            start_sq, end_sq = parse_square(start), parse_square(end)
+            promotion = move[5].upper() if len(move) == 6 else "Q"
+
+            piece = board.piece_at(start_sq)
             if piece == "." or piece.islower():  
                 print("Invalid move. Choose a valid white piece.")
                 continue
 
-            new_board = copy.deepcopy(board)
-            new_board[end_row][end_col] = piece
-            new_board[start_row][start_col] = "."
-            return new_board
+            for legal in legal_moves:
+                if legal[0] == start_sq and legal[1] == end_sq and legal[3] in (None, promotion):
+                    board.make_move(legal)
+                    return legal
+            print("Illegal move. Try again.")
         except Exception as e:
             print(e)
 
 def main():
-    board = create_board()
+    parser = argparse.ArgumentParser(description="Play chess against the minimax AI.")
+    parser.add_argument("--backend", choices=["list", "bitboard"], default="list",
+                        help="board representation used by the AI")
+    parser.add_argument("--time-ms", type=int, default=2000,
+                        help="thinking time per AI move in milliseconds")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for root-parallel search")
+    parser.add_argument("--book", help="opening book file built with book.py")
+    parser.add_argument("--tablebases", help="directory of endgame tables built with tablebase.py")
+    parser.add_argument("--no-ponder", action="store_true",
+                        help="do not search the expected reply while you think")
+    args = parser.parse_args()
+
+    if args.backend == "bitboard":
+        from bitboard import BitBoard
+        board = BitBoard()
+    else:
+        board = ListBoard()
+    tablebases = None
+    if args.tablebases:
+        from tablebase import Tablebases
+        tablebases = Tablebases(args.tablebases)
+    if args.workers > 1:
+        from parallel import ParallelSearch
+        search = ParallelSearch(args.workers, tablebases)
+    else:
+        search = Search(tablebases=tablebases)
+    ponderer = Ponderer(search) if args.workers <= 1 and not args.no_ponder else None
+    book = None
+    if args.book:
+        from book import OpeningBook
+        book = OpeningBook(args.book)
     print("Initial Board:")
     print_board(board)
 
     while True:
 
+        if not board.generate_moves(True):
+            print("Checkmate! AI wins." if board.in_check(True) else "Stalemate.")
+            break
         print("Your Turn:")
-        board = player_move(board)
+        nodes, quiescence_nodes = search.nodes, search.quiescence_nodes
+        move = player_move(board)
+        pondered = ponderer.finish(move, args.time_ms) if ponderer else None
+        if pondered is None:
+            nodes, quiescence_nodes = search.nodes, search.quiescence_nodes
         print_board(board)
 
         print("AI's Turn:")
-        board = minimax(board, 3, False, float("-inf"), float("inf"))
+        move = book.choose_move(board, False) if book else None
+        if move is not None:
+            print("AI played a book move.")
+            board.make_move(move)
+            print_board(board)
+            continue
+        if pondered is not None and pondered[1] is not None:
+            print("AI predicted your move.")
+            _, move, depth = pondered
+        else:
+            _, move, depth = search.iterative_deepening(board, False, args.time_ms)
+        if move is None:
+            print("Checkmate! You win." if board.in_check(False) else "Stalemate.")
+            break
+        print(f"AI searched to depth {depth}: {search.nodes - nodes} nodes, "
+              f"{search.quiescence_nodes - quiescence_nodes} of them in quiescence search.")
+        board.make_move(move)
         print_board(board)
+        if ponderer:
+            ponderer.start(board, True)
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import json
+
+import pytest
+
+from analyze import analyse_file
+from book import OpeningBook, build_book, encode_move, parse_san, read_games
+from perft import BACKENDS, PERFT_POSITIONS, compare_backends, perft
+from tablebase import Tablebases, build
+from tactics import TACTICAL_POSITIONS, solve
+from terminal import MATE_SCORE, START_FEN, board_from_fen, parse_square
+
+# Fixed search depth at which each tactical position is solved, so the
+# check does not depend on how fast the machine is.
+# (FEN, side to move is white, SAN, from square, to square, promotion)
+SAN_MOVES = [
+    ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq -", True, "O-O", "e1", "g1", None),
+    ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq -", True, "O-O-O", "e1", "c1", None),
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq -", False, "O-O", "e8", "g8", None),
+    ("rnbqkb1r/ppp2ppp/5n2/8/8/8/PPPPPPPP/RNBQKBNR b KQkq -", False, "Nbd7", "b8", "d7", None),
+    ("rnbqkb1r/ppp2ppp/5n2/8/8/8/PPPPPPPP/RNBQKBNR b KQkq -", False, "Nfd7", "f6", "d7", None),
+    ("4k3/8/8/8/4R3/8/8/R5K1 w - -", True, "R1e1", "a1", "e1", None),
+    ("4k3/8/8/8/4R3/8/8/R5K1 w - -", True, "R4e1+", "e4", "e1", None),
+    ("8/4P3/8/8/8/8/k7/4K3 w - -", True, "e8=Q", "e7", "e8", "Q"),
+    ("8/4P3/8/8/8/8/k7/4K3 w - -", True, "e8N", "e7", "e8", "N"),
+]
+# Three games: 1. e4 twice, then 1... e5 once, so a minimum count of two
+# keeps only 1. e4. The second game has comments and nested variations.
+BOOK_PGN = """[Event "one"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Event "two"]
+[Result "1/2-1/2"]
+
+1. e4 {the usual} c5 (1... e5 2. Nf3 (2. f4 exf4)) 2. Nf3 ; Open Sicilian next
+d6 $1 1/2-1/2
+
+[Event "three"]
+[Result "0-1"]
+
+1. d4 d5 0-1
+"""
+
+TACTICAL_DEPTHS = {
+    "back rank mate": 2,
+    "scholar's mate": 2,
+    "knight fork": 2,
+    "WAC.001": 4,
+    "WAC.003": 3,
+    "WAC.004": 4,
+    "WAC.005": 4,
+    "WAC.008": 2,
+    "zugzwang": 8,
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name, fen, expected", PERFT_POSITIONS, ids=[p[0] for p in PERFT_POSITIONS])
+def test_perft(backend, name, fen, expected):
+    for depth in (2, 3):
+        board, is_white = board_from_fen(fen, BACKENDS[backend])
+        assert perft(board, depth, is_white) == expected[depth - 1]
+
+
+@pytest.mark.parametrize("name, fen, expected", PERFT_POSITIONS, ids=[p[0] for p in PERFT_POSITIONS])
+def test_backends_agree(name, fen, expected):
+    list_board, is_white = board_from_fen(fen, BACKENDS["list"])
+    bit_board, _ = board_from_fen(fen, BACKENDS["bitboard"])
+    assert compare_backends(list_board, bit_board, 2, is_white) is None
+
+
+@pytest.mark.parametrize("name, fen, best", TACTICAL_POSITIONS, ids=[p[0] for p in TACTICAL_POSITIONS])
+def test_tactics(name, fen, best):
+    move, _, _ = solve(fen, None, TACTICAL_DEPTHS[name])
+    assert move == best
+
+
+def test_analyse_resume_past_bad_lines(tmp_path):
+    positions = tmp_path / "positions.fen"
+    output = str(tmp_path / "analysis.jsonl")
+    positions.write_text(START_FEN + "\n8/8/8/8/8/8/8/8 w - -\n" + START_FEN + "\n")
+    assert analyse_file(str(positions), output, depth=1, workers=1, checkpoint_every=2) == 3
+    # A run that stopped after the checkpoint: more input, half a line of output.
+    with open(positions, "a") as more:
+        more.write("rnbqkbnx/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -\n" + START_FEN + "\n")
+    with open(output, "a") as partial:
+        partial.write('{"line": 4, "fe')
+    assert analyse_file(str(positions), output, depth=1, workers=1, checkpoint_every=2, resume=True) == 2
+
+    with open(output) as analysis:
+        records = [json.loads(line) for line in analysis]
+    assert [record["line"] for record in records] == [1, 2, 3, 4, 5]
+    assert ["error" in record for record in records] == [False, True, False, True, False]
+    assert all(record["bestmove"] for record in records if "error" not in record)
+
+
+@pytest.mark.parametrize("fen, is_white, san, from_sq, to_sq, promotion", SAN_MOVES, ids=[m[2] for m in SAN_MOVES])
+def test_parse_san(fen, is_white, san, from_sq, to_sq, promotion):
+    board, _ = board_from_fen(fen)
+    move = parse_san(board, is_white, san)
+    assert (move[0], move[1], move[3]) == (parse_square(from_sq), parse_square(to_sq), promotion)
+
+
+def test_book_round_trip(tmp_path):
+    (tmp_path / "games.pgn").write_text(BOOK_PGN)
+    assert [sans for _, sans in read_games(tmp_path / "games.pgn")] == [
+        ["e4", "e5", "Nf3", "Nc6"], ["e4", "c5", "Nf3", "d6"], ["d4", "d5"]]
+    path = str(tmp_path / "book.bin")
+    assert build_book(str(tmp_path), path) == 3
+
+    board, is_white = board_from_fen(START_FEN)
+    e4 = parse_san(board, is_white, "e4")
+    with OpeningBook(path) as book:
+        assert book.count == 1
+        # Won once and drawn once: 2 + 1 points.
+        assert book.entries(board.hash) == [(encode_move(board, e4), 3)]
+        assert book.choose_move(board, is_white) == e4
+        board.make_move(e4)
+        assert book.choose_move(board, not is_white) is None
+
+
+@pytest.fixture(scope="module")
+def tablebases(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("tablebases"))
+    build(["KQK", "KRK"], directory, verbose=False)
+    tables = Tablebases(directory)
+    yield tables
+    tables.close()
+
+
+@pytest.mark.parametrize("name, longest", [("KQK", 10), ("KRK", 16)])
+def test_longest_mate(tablebases, name, longest):
+    table = tablebases.tables[name]
+    # A white-to-move value v is a mate in v - 1 plies, which is v // 2 moves.
+    assert max(table[:len(table) // 2]) // 2 == longest
+
+
+@pytest.mark.parametrize("fen, mirrored", [
+    ("6k1/8/6K1/8/8/8/8/Q7 w - -", "q7/8/8/8/8/6k1/8/6K1 b - -"),
+    ("6k1/8/6K1/8/8/8/8/Q7 b - -", "q7/8/8/8/8/6k1/8/6K1 w - -"),
+    ("8/8/8/3k4/8/8/8/R3K3 w - -", "r3k3/8/8/8/3K4/8/8/8 b - -"),
+])
+def test_probe_mirrored(tablebases, fen, mirrored):
+    board, is_white = board_from_fen(fen)
+    score = tablebases.probe(board, is_white)
+    assert score is not None and score != 0
+    board, is_white = board_from_fen(mirrored)
+    assert tablebases.probe(board, is_white) == score
+
+
+def test_best_move_mates(tablebases):
+    board, is_white = board_from_fen("6k1/8/6K1/8/8/8/8/Q7 w - -")
+    score, move = tablebases.best_move(board, is_white)
+    assert score == MATE_SCORE - 1
+    assert move[:2] == (parse_square("a1"), parse_square("a8"))
@@ -0,0 +1,184 @@
+import argparse
+import sys
+import threading
+import time
+
+from terminal import ListBoard, MATE_SCORE, MAX_PLY, START_FEN, Search, board_from_fen, square_name
+
+# Without movestogo, assume this many moves are left in the game when
+# splitting the clock.
+DEFAULT_MOVES_TO_GO = 30
+
+
+def move_to_uci(move):
+    promotion = move[3].lower() if move[3] else ""
+    return square_name(move[0]) + square_name(move[1]) + promotion
+
+
+def parse_uci_move(board, is_white, text):
+    """Find the legal move written in UCI long algebraic notation, or None."""
+    for move in board.generate_moves(is_white):
+        if move_to_uci(move) == text:
+            return move
+    return None
+
+
+def format_score(score):
+    if abs(score) > MATE_SCORE - MAX_PLY:
+        plies = MATE_SCORE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {round(score)}"
+
+
+def time_budget_ms(params, is_white):
+    """Thinking time for a go command in milliseconds, or None to search without a limit."""
+    if "movetime" in params:
+        return params["movetime"]
+    remaining = params.get("wtime" if is_white else "btime")
+    if remaining is None:
+        return None
+    increment = params.get("winc" if is_white else "binc", 0)
+    budget = remaining / params.get("movestogo", DEFAULT_MOVES_TO_GO) + increment / 2
+    return max(1, min(budget, remaining / 2))
+
+
+class UCIEngine:
+    """Universal Chess Interface front end.
+
+    Searches run on a background thread so commands such as isready and stop
+    are answered while the engine is thinking.
+    """
+
+    def __init__(self, board_class=ListBoard, output=sys.stdout, tablebases=None):
+        self.board_class = board_class
+        self.output = output
+        self.tablebases = tablebases
+        self.search = Search(tablebases=tablebases)
+        self.board, self.is_white = board_from_fen(START_FEN, board_class)
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def send(self, line):
+        with self.lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line):
+        """Run one command; returns False once the engine should exit."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send("id name Terminal Chess")
+            self.send("id author Terminal Chess authors")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self.search = Search(tablebases=self.tablebases)
+        elif command == "position":
+            self.stop()
+            self.set_position(args)
+        elif command == "go":
+            self.stop()
+            self.go(args)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+        return True
+
+    def set_position(self, args):
+        if args and args[0] == "startpos":
+            fen, rest = START_FEN, args[1:]
+        elif args and args[0] == "fen":
+            end = args.index("moves") if "moves" in args else len(args)
+            fen, rest = " ".join(args[1:end]), args[end:]
+        else:
+            return
+        self.board, self.is_white = board_from_fen(fen, self.board_class)
+        for text in rest[1:]:
+            move = parse_uci_move(self.board, self.is_white, text)
+            if move is None:
+                self.send(f"info string illegal move {text}")
+                return
+            self.board.make_move(move)
+            self.is_white = not self.is_white
+
+    def go(self, args):
+        params = {}
+        infinite = False
+        for index, token in enumerate(args):
+            if token == "infinite":
+                infinite = True
+            elif token in ("wtime", "btime", "winc", "binc", "movestogo", "movetime", "depth"):
+                params[token] = int(args[index + 1])
+        budget = None if infinite else time_budget_ms(params, self.is_white)
+        max_depth = params.get("depth", 64)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.think, args=(budget, max_depth, infinite), daemon=True)
+        self.thread.start()
+
+    def think(self, budget, max_depth, infinite):
+        board, is_white, search = self.board, self.is_white, self.search
+        start = time.perf_counter()
+        nodes = search.nodes
+
+        def report(depth, score, pv):
+            searched = search.nodes - nodes
+            elapsed = time.perf_counter() - start
+            nps = int(searched / elapsed) if elapsed > 0 else 0
+            self.send(f"info depth {depth} score {format_score(score)} nodes {searched} nps {nps} "
+                      f"time {int(elapsed * 1000)} pv {' '.join(move_to_uci(move) for move in pv)}")
+
+        _, move, _ = search.iterative_deepening(board, is_white, budget, max_depth, report)
+        if move is None:
+            # Stopped before depth 1 finished; any legal move beats none.
+            moves = board.generate_moves(is_white)
+            move = moves[0] if moves else None
+        # In infinite mode the best move is only sent once the GUI says stop.
+        if infinite:
+            self.stop_event.wait()
+        self.send(f"bestmove {move_to_uci(move) if move else '0000'}")
+
+    def stop(self):
+        """Stop any running search and wait for it to send its best move."""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        # The search clears stopped when it starts, so keep setting it until the thread ends.
+        while self.thread.is_alive():
+            self.search.stopped = True
+            self.thread.join(0.01)
+        self.thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the chess engine over the UCI protocol on stdin/stdout.")
+    parser.add_argument("--backend", choices=["list", "bitboard"], default="list",
+                        help="board representation used by the engine")
+    parser.add_argument("--tablebases", help="directory of endgame tables built with tablebase.py")
+    args = parser.parse_args()
+
+    tablebases = None
+    if args.tablebases:
+        from tablebase import Tablebases
+        tablebases = Tablebases(args.tablebases)
+    if args.backend == "bitboard":
+        from bitboard import BitBoard
+        engine = UCIEngine(BitBoard, tablebases=tablebases)
+    else:
+        engine = UCIEngine(tablebases=tablebases)
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import hints
+
 def print_board(board):
     for row in board:
         print(" ".join(str(num) if num != 0 else '.' for num in row))
@@ -9,19 +11,26 @@ def is_valid(board, row_sets, col_sets, box_sets, row, col, num):
             num not in col_sets[col] and
             num not in box_sets[box_index])
 
-def ai_move(board, row_sets, col_sets, box_sets):
-    for r in range(9):
-        for c in range(9):
-            if board[r][c] == 0: 
-                for num in range(1, 10):
-                    if is_valid(board, row_sets, col_sets, box_sets, r, c, num):
-            
-                        board[r][c] = num
-                        row_sets[r].add(num)
-                        col_sets[c].add(num)
-                        box_sets[(r // 3) * 3 + (c // 3)].add(num)
-                        return True 
-    return False 
+def ai_move(board, row_sets, col_sets, box_sets, engine):
+    hint = engine.hint()
+    if hint is None:
+        return False
+    r, c, box_index = hint.row, hint.col, (hint.row // 3) * 3 + (hint.col // 3)
+    print(hint.reason)
+    if hint.num:
+        board[r][c] = hint.num
+        row_sets[r].add(hint.num)
+        col_sets[c].add(hint.num)
+        box_sets[box_index].add(hint.num)
+        engine.place(r, c, hint.num)
+    else:
+        num = board[r][c]
+        board[r][c] = 0
+        row_sets[r].discard(num)
+        col_sets[c].discard(num)
+        box_sets[box_index].discard(num)
+        engine.clear(r, c)
+    return True
 
 def player_move(board, row_sets, col_sets, box_sets):
     while True:
@@ -34,7 +43,7 @@ def player_move(board, row_sets, col_sets, box_sets):
                 row_sets[row].add(num)
                 col_sets[col].add(num)
                 box_sets[(row // 3) * 3 + (col // 3)].add(num)
-                break
+                return row, col, num
             else:
                 print("Invalid move. Try again.")
         except (ValueError, IndexError):
@@ -54,6 +63,7 @@ def solve_sudoku(board):
                 col_sets[c].add(num)
                 box_sets[(r // 3) * 3 + (c // 3)].add(num)
 
+    engine = hints.HintEngine(board)
     turn = 'AI' 
     while True:
         print_board(board)
@@ -63,13 +73,13 @@ def solve_sudoku(board):
 
         if turn == 'AI':
             print("AI's turn:")
-            if not ai_move(board, row_sets, col_sets, box_sets):
+            if not ai_move(board, row_sets, col_sets, box_sets, engine):
                 print("AI has no valid moves left.")
                 break
             turn = 'Player'  
         else:
             print("Player's turn:")
-            player_move(board, row_sets, col_sets, box_sets)
+            engine.place(*player_move(board, row_sets, col_sets, box_sets))
             turn = 'AI'  
 
 sudoku_board = [
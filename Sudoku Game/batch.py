@@ -0,0 +1,141 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import solver
+
+# Puzzles are read one per line as 81 characters, digits for givens and "0"
+# or "." for empty cells; anything after a comma (such as a known solution)
+# is ignored. Each output line is the puzzle, a comma and its solution, or
+# nothing after the comma if it has none; a line that is not a puzzle is
+# echoed the same way, so output lines always match input lines.
+UNITS = np.array(solver.ROW_CELLS + solver.COL_CELLS + solver.BOX_CELLS, dtype=np.intp)
+PEERS = np.array([sorted(set(solver.ROW_CELLS[cell // 9] + solver.COL_CELLS[cell % 9]
+                             + solver.BOX_CELLS[solver.CELL_UNITS[cell][2]]) - {cell})
+                  for cell in range(81)], dtype=np.intp)
+POPCOUNT = np.array(solver.POPCOUNT, dtype=np.uint8)
+# Digit for a single-bit candidate mask, 0 for any other mask.
+SINGLE_DIGIT = np.zeros(solver.ALL_DIGITS + 1, dtype=np.uint8)
+SINGLE_DIGIT[[1 << digit for digit in range(9)]] = np.arange(1, 10)
+DIGIT_BITS = np.arange(9, dtype=np.uint16)
+
+
+def digit_bits(grids):
+    """Bit 1 << (digit - 1) for every filled cell of an (N, 81) batch, 0 for empty cells."""
+    return np.where(grids > 0, np.left_shift(1, grids.astype(np.int16) - 1), 0).astype(np.uint16)
+
+
+def candidates(grids):
+    """Candidate masks for every cell of an (N, 81) batch; filled cells get 0."""
+    used = np.bitwise_or.reduce(digit_bits(grids)[:, PEERS], axis=2)
+    return np.where(grids == 0, ~used & solver.ALL_DIGITS, 0).astype(np.uint16)
+
+
+def propagate(grids):
+    """Fill naked and hidden singles in every grid of the batch at once, in place."""
+    active = np.arange(len(grids))
+    while len(active):
+        batch = grids[active]
+        masks = candidates(batch)
+        naked = SINGLE_DIGIT[masks]
+        progress = naked.any(axis=1)
+        batch = np.where(naked > 0, naked, batch)
+        # Hidden singles, a digit with exactly one candidate cell in a unit,
+        # for the grids that had no naked single this pass.
+        stuck = np.nonzero(~progress)[0]
+        unit_bits = (masks[stuck][:, UNITS, None] >> DIGIT_BITS) & 1
+        hidden = unit_bits.sum(axis=2) == 1
+        grid_index, unit, digit = np.nonzero(hidden)
+        position = unit_bits[grid_index, unit, :, digit].argmax(axis=1)
+        batch[stuck[grid_index], UNITS[unit, position]] = digit + 1
+        progress[stuck] = hidden.any(axis=(1, 2))
+        grids[active] = batch
+        active = active[progress]
+
+
+def solve_batch(grids):
+    """Solve an (N, 81) uint8 batch in place; returns a boolean array of which grids were solved.
+
+    Puzzles that propagation leaves unfinished are finished one at a time by
+    solver.solve.
+    """
+    propagate(grids)
+    # Singles hold in every solution, so a full grid is solved unless two of
+    # them clashed, which only happens when there is no solution.
+    full = (grids > 0).all(axis=1)
+    solved = full & (np.bitwise_or.reduce(digit_bits(grids)[:, UNITS], axis=2) == solver.ALL_DIGITS).all(axis=1)
+    for index in np.nonzero(~full)[0]:
+        board = grids[index].reshape(9, 9).tolist()
+        if solver.solve(board):
+            grids[index] = np.array(board, dtype=np.uint8).ravel()
+            solved[index] = True
+    return solved
+
+
+def is_puzzle(text):
+    return len(text) == 81 and text.isdigit()
+
+
+def read_batches(stream, batch_size):
+    """Yield lists of up to batch_size puzzle strings from a text stream, one per line.
+
+    Lines that are not puzzles are kept, as their text before any comma, so
+    callers can pass them through; is_puzzle tells them apart.
+    """
+    batch = []
+    for line in stream:
+        text = line.split(",")[0].strip()
+        puzzle = text.replace(".", "0")
+        batch.append(puzzle if is_puzzle(puzzle) else text)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run(source, output, batch_size=10000):
+    """Solve every puzzle in source, writing a line per input line to output. Returns (puzzles, solved).
+
+    Lines that are not puzzles are echoed with an empty solution but not counted.
+    """
+    puzzle_count = solved_total = 0
+    for lines in read_batches(source, batch_size):
+        puzzles = [puzzle for puzzle in lines if is_puzzle(puzzle)]
+        grids = np.frombuffer("".join(puzzles).encode(), dtype=np.uint8).reshape(-1, 81) - ord("0")
+        solved = solve_batch(grids)
+        digits = (grids + ord("0")).tobytes().decode()
+        index = 0
+        for line in lines:
+            solution = ""
+            if is_puzzle(line):
+                if solved[index]:
+                    solution = digits[index * 81:index * 81 + 81]
+                index += 1
+            output.write(f"{line},{solution}\n")
+        puzzle_count += len(puzzles)
+        solved_total += int(solved.sum())
+    return puzzle_count, solved_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a file of one-line Sudoku puzzles in vectorized batches.")
+    parser.add_argument("input", nargs="?", help="puzzle file (default: standard input)")
+    parser.add_argument("output", nargs="?", help="solution file (default: standard output)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="puzzles propagated together")
+    args = parser.parse_args()
+
+    source = open(args.input) if args.input else sys.stdin
+    output = open(args.output, "w") if args.output else sys.stdout
+    start = time.perf_counter()
+    with source, output:
+        puzzles, solved = run(source, output, args.batch_size)
+    elapsed = time.perf_counter() - start
+    rate = puzzles / elapsed if elapsed > 0 else 0
+    print(f"Solved {solved}/{puzzles} puzzles in {elapsed:.2f}s ({rate:.0f} puzzles/s).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
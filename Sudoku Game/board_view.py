@@ -0,0 +1,182 @@
+import argparse
+import time
+import tkinter as tk
+from bisect import bisect_right
+from math import isqrt
+
+# Two interchangeable ways of drawing an n^2 x n^2 board: a Frame and a
+# Label for every cell, or every cell as a rectangle and a text item on one
+# Canvas. Both take the same calls (show, highlight, cell_at) and report
+# clicks through on_click(row, col), so the game does not care which it
+# has. Boxes are separated by a gap of BOX_GAP pixels.
+BOX_GAP = 2
+BORDER = 2
+BACKGROUND = 'black'
+SELECTED = '#333'
+FOREGROUND = '#00ffff'
+BOX_LINE = '#666'
+
+
+class WidgetGrid:
+    """One Frame with a Label inside for every cell."""
+
+    def __init__(self, parent, size=9, cell_size=60, font=('Arial', 24), on_click=None):
+        self.size = size
+        self.cell_size = cell_size
+        box_size = isqrt(size)
+        self.widget = tk.Frame(parent, bg=BACKGROUND, bd=BORDER, relief='solid')
+        self.labels = []
+        for i in range(size):
+            row = []
+            for j in range(size):
+                cell_frame = tk.Frame(
+                    self.widget,
+                    width=cell_size,
+                    height=cell_size,
+                    bg=BACKGROUND,
+                    highlightthickness=1,
+                    highlightbackground=SELECTED
+                )
+                cell_frame.grid_propagate(False)
+                cell_frame.grid(row=i, column=j,
+                                padx=(BOX_GAP if j % box_size == 0 and j != 0 else 0, 0),
+                                pady=(BOX_GAP if i % box_size == 0 and i != 0 else 0, 0))
+                label = tk.Label(cell_frame, text='', font=font, bg=BACKGROUND, fg=FOREGROUND, justify='center')
+                label.place(relx=0.5, rely=0.5, anchor='center')
+                if on_click:
+                    cell_frame.bind('<Button-1>', lambda e, row=i, col=j: on_click(row, col))
+                    label.bind('<Button-1>', lambda e, row=i, col=j: on_click(row, col))
+                row.append(label)
+            self.labels.append(row)
+
+        # Cell offsets inside the grid frame, measured on first use
+        self.col_starts = None
+        self.row_starts = None
+        self.widget.bind('<Configure>', self.forget_geometry)
+
+    def show(self, row, col, text):
+        self.labels[row][col].configure(text=text)
+
+    def highlight(self, row, col, selected):
+        self.labels[row][col].master.configure(bg=SELECTED if selected else BACKGROUND)
+
+    def forget_geometry(self, event=None):
+        """Drop the cached cell offsets after the grid is laid out again."""
+        self.col_starts = None
+        self.row_starts = None
+
+    def cell_at(self, x_root, y_root):
+        """Return the (row, col) under a screen position, or None, from the cached cell offsets."""
+        if self.col_starts is None:
+            self.col_starts = [self.labels[0][j].master.winfo_x() for j in range(self.size)]
+            self.row_starts = [self.labels[i][0].master.winfo_y() for i in range(self.size)]
+        # Only the grid origin is asked for, since the window may have moved.
+        return _cell_at(self.col_starts, self.row_starts, self.cell_size,
+                        x_root - self.widget.winfo_rootx(), y_root - self.widget.winfo_rooty())
+
+
+class CanvasGrid:
+    """The whole board on a single Canvas, with a rectangle and a text item per cell."""
+
+    def __init__(self, parent, size=9, cell_size=60, font=('Arial', 24), on_click=None):
+        self.size = size
+        self.cell_size = cell_size
+        self.on_click = on_click
+        box_size = isqrt(size)
+        # Cell positions are fixed, so they are worked out once here.
+        self.starts = [BORDER + i * cell_size + i // box_size * BOX_GAP for i in range(size)]
+        extent = self.starts[-1] + cell_size + BORDER
+        self.widget = tk.Canvas(parent, width=extent, height=extent, bg=BACKGROUND, highlightthickness=0)
+        self.rects = []
+        self.texts = []
+        half = cell_size / 2
+        for i in range(size):
+            rects, texts = [], []
+            for j in range(size):
+                x, y = self.starts[j], self.starts[i]
+                rects.append(self.widget.create_rectangle(x, y, x + cell_size - 1, y + cell_size - 1,
+                                                          fill=BACKGROUND, outline=SELECTED))
+                texts.append(self.widget.create_text(x + half, y + half, text='', font=font, fill=FOREGROUND))
+            self.rects.append(rects)
+            self.texts.append(texts)
+        for box in range(1, box_size):
+            line = self.starts[box * box_size] - BOX_GAP / 2
+            self.widget.create_line(line, 0, line, extent, fill=BOX_LINE, width=BOX_GAP)
+            self.widget.create_line(0, line, extent, line, fill=BOX_LINE, width=BOX_GAP)
+        self.widget.create_rectangle(BORDER / 2, BORDER / 2, extent - BORDER / 2, extent - BORDER / 2,
+                                     outline=BOX_LINE, width=BORDER)
+        self.widget.bind('<Button-1>', self._clicked)
+
+    def _clicked(self, event):
+        cell = _cell_at(self.starts, self.starts, self.cell_size,
+                        self.widget.canvasx(event.x), self.widget.canvasy(event.y))
+        if cell and self.on_click:
+            self.on_click(*cell)
+
+    def show(self, row, col, text):
+        self.widget.itemconfigure(self.texts[row][col], text=text)
+
+    def highlight(self, row, col, selected):
+        self.widget.itemconfigure(self.rects[row][col], fill=SELECTED if selected else BACKGROUND)
+
+    def cell_at(self, x_root, y_root):
+        """Return the (row, col) under a screen position, or None."""
+        return _cell_at(self.starts, self.starts, self.cell_size,
+                        self.widget.canvasx(x_root - self.widget.winfo_rootx()),
+                        self.widget.canvasy(y_root - self.widget.winfo_rooty()))
+
+
+def _cell_at(col_starts, row_starts, cell_size, x, y):
+    """Cell containing a point given in the grid's own coordinates, or None."""
+    col = bisect_right(col_starts, x) - 1
+    row = bisect_right(row_starts, y) - 1
+    if row < 0 or col < 0 or x > col_starts[col] + cell_size or y > row_starts[row] + cell_size:
+        return None
+    return row, col
+
+
+RENDERERS = {"widgets": WidgetGrid, "canvas": CanvasGrid}
+
+
+def benchmark(root, renderer, size, redraws):
+    """Return (startup, redraw) in seconds for a renderer.
+
+    startup covers building the grid until it is on screen; redraw is the
+    average time to change the text of every cell and show the result.
+    """
+    cell_size = max(24, 540 // size)
+    font = ('Arial', cell_size * 2 // 5)
+    start = time.perf_counter()
+    view = renderer(root, size, cell_size, font)
+    view.widget.pack()
+    root.update()
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for n in range(redraws):
+        for row in range(size):
+            for col in range(size):
+                view.show(row, col, str((row + col + n) % size + 1))
+        root.update()
+    redraw = (time.perf_counter() - start) / redraws
+    view.widget.destroy()
+    return startup, redraw
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the widget and canvas board renderers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9, 16, 25], help="board sizes to draw")
+    parser.add_argument("--redraws", type=int, default=20, help="full redraws to average over")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    print(f"{'size':>5} {'renderer':>9} {'startup ms':>11} {'redraw ms':>10}")
+    for size in args.sizes:
+        for name, renderer in RENDERERS.items():
+            startup, redraw = benchmark(root, renderer, size, args.redraws)
+            print(f"{size:>5} {name:>9} {startup * 1000:>11.1f} {redraw * 1000:>10.2f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+from math import isqrt
+
+# Sudoku as exact cover, solved with Knuth's Algorithm X on dancing links.
+# Every cell, row-digit, column-digit and box-digit pair is a column that
+# must be covered exactly once, and every candidate (cell, digit) is a row
+# covering four of them. The links live in parallel integer lists indexed by
+# node number rather than in one object per node: node 0 is the root, nodes
+# 1..columns are the column headers, and row nodes follow.
+
+
+class DancingLinks:
+    """Exact cover matrix with Algorithm X search."""
+
+    def __init__(self, columns):
+        self.left = [columns] + list(range(columns))
+        self.right = list(range(1, columns + 1)) + [0]
+        self.up = list(range(columns + 1))
+        self.down = list(range(columns + 1))
+        self.column = list(range(columns + 1))
+        self.size = [0] * (columns + 1)
+        self.row_id = [None] * (columns + 1)
+        self.count = 0
+        self.first = None
+
+    def add_row(self, row_id, columns):
+        """Add a row covering the given 0-based columns."""
+        left, right, up, down = self.left, self.right, self.up, self.down
+        first = len(left)
+        for column in columns:
+            header = column + 1
+            node = len(left)
+            self.column.append(header)
+            self.row_id.append(row_id)
+            self.size[header] += 1
+            up.append(up[header])
+            down.append(header)
+            down[up[header]] = node
+            up[header] = node
+            left.append(node - 1 if node > first else node)
+            right.append(first)
+            if node > first:
+                right[node - 1] = node
+                left[first] = node
+
+    def cover(self, header):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        row = down[header]
+        while row != header:
+            node = right[row]
+            while node != row:
+                up[down[node]] = up[node]
+                down[up[node]] = down[node]
+                size[column[node]] -= 1
+                node = right[node]
+            row = down[row]
+
+    def uncover(self, header):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        row = up[header]
+        while row != header:
+            node = left[row]
+            while node != row:
+                size[column[node]] += 1
+                up[down[node]] = node
+                down[up[node]] = node
+                node = left[node]
+            row = up[row]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def search(self, limit=None):
+        """Count exact covers, stopping once limit are found.
+
+        Returns the count; the first cover found, as a list of row ids, is
+        kept in first.
+        """
+        self.count = 0
+        self.first = None
+        self._search([], limit or float("inf"))
+        return self.count
+
+    def _search(self, partial, limit):
+        right, down, column, size = self.right, self.down, self.column, self.size
+        header = right[0]
+        if header == 0:
+            self.count += 1
+            if self.first is None:
+                self.first = list(partial)
+            return self.count >= limit
+        # Branch on the column with the fewest rows left.
+        best = header
+        while header and size[best] > 1:
+            if size[header] < size[best]:
+                best = header
+            header = right[header]
+        if not size[best]:
+            return False
+
+        self.cover(best)
+        row = down[best]
+        stop = False
+        while row != best and not stop:
+            partial.append(self.row_id[row])
+            node = right[row]
+            while node != row:
+                self.cover(column[node])
+                node = right[node]
+            stop = self._search(partial, limit)
+            node = self.left[row]
+            while node != row:
+                self.uncover(column[node])
+                node = self.left[node]
+            partial.pop()
+            row = down[row]
+        self.uncover(best)
+        return stop
+
+
+def _sudoku_links(board):
+    """Build the exact cover matrix for an n^2 x n^2 board, or None if its givens conflict."""
+    size = len(board)
+    box_size = isqrt(size)
+    cells = size * size
+    used = [set() for _ in range(3 * size)]
+    for row in range(size):
+        for col in range(size):
+            num = board[row][col]
+            if num:
+                units = (row, size + col, 2 * size + row // box_size * box_size + col // box_size)
+                if any(num in used[unit] for unit in units):
+                    return None
+                for unit in units:
+                    used[unit].add(num)
+
+    links = DancingLinks(4 * cells)
+    for row in range(size):
+        for col in range(size):
+            if board[row][col]:
+                continue
+            box = row // box_size * box_size + col // box_size
+            for num in range(1, size + 1):
+                if num in used[row] or num in used[size + col] or num in used[2 * size + box]:
+                    continue
+                digit = num - 1
+                links.add_row((row, col, num), (row * size + col, cells + row * size + digit,
+                                                2 * cells + col * size + digit, 3 * cells + box * size + digit))
+    # Constraints the givens already meet have no rows; take them out of play.
+    for row in range(size):
+        for col in range(size):
+            num = board[row][col]
+            if num:
+                box = row // box_size * box_size + col // box_size
+                digit = num - 1
+                for column in (row * size + col, cells + row * size + digit,
+                               2 * cells + col * size + digit, 3 * cells + box * size + digit):
+                    links.cover(column + 1)
+    return links
+
+
+def count_solutions(board, limit=None):
+    """Count the solutions of an n^2 x n^2 board, stopping at limit (2 is enough for a uniqueness check)."""
+    links = _sudoku_links(board)
+    return links.search(limit) if links is not None else 0
+
+
+def solve(board):
+    """Solve an n^2 x n^2 board in place; same contract as solver.solve."""
+    links = _sudoku_links(board)
+    if links is None or not links.search(1):
+        return False
+    for row, col, num in links.first:
+        board[row][col] = num
+    return True
@@ -0,0 +1,146 @@
+import argparse
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import dlx
+import hints
+import solver
+
+# A puzzle is graded by the hardest technique a human-style solver needs to
+# finish it, always trying the easiest technique that still makes progress:
+# naked singles, then hidden singles, then naked pairs and pointing pairs
+# (candidates locked to one row or column of a box). A puzzle that needs an
+# X-wing, or guessing, is "expert".
+DIFFICULTIES = ["easy", "medium", "hard", "expert"]
+# Giving up after this many generated puzzles of the wrong difficulty.
+MAX_ATTEMPTS = 200
+
+
+def filled_grid(rng=random):
+    """A random complete 9x9 grid."""
+    board = [[0] * 9 for _ in range(9)]
+    # The three boxes on the diagonal share no row, column or box, so any
+    # digits can go in them; the solver completes the rest.
+    for box in range(3):
+        digits = rng.sample(range(1, 10), 9)
+        for index, num in enumerate(digits):
+            board[box * 3 + index // 3][box * 3 + index % 3] = num
+    solver.solve(board)
+    # Shuffling rows within bands and bands within the grid keeps it valid
+    # and spreads the solver's bias over the whole grid.
+    bands = rng.sample(range(3), 3)
+    rows = [band * 3 + row for band in bands for row in rng.sample(range(3), 3)]
+    stacks = rng.sample(range(3), 3)
+    cols = [stack * 3 + col for stack in stacks for col in rng.sample(range(3), 3)]
+    return [[board[row][col] for col in cols] for row in rows]
+
+
+def remove_clues(board, rng=random, symmetric=True, min_clues=17):
+    """Empty cells of a solved board in random order, keeping every removal that leaves one solution.
+
+    With symmetric, cells are removed in pairs mirrored through the centre.
+    The board is changed in place and returned.
+    """
+    cells = list(range(41 if symmetric else 81))
+    rng.shuffle(cells)
+    clues = 81
+    for cell in cells:
+        group = {cell, 80 - cell} if symmetric else {cell}
+        if clues - len(group) < min_clues:
+            continue
+        saved = [board[c // 9][c % 9] for c in group]
+        for c in group:
+            board[c // 9][c % 9] = 0
+        if dlx.count_solutions(board, 2) == 1:
+            clues -= len(group)
+        else:
+            for c, num in zip(group, saved):
+                board[c // 9][c % 9] = num
+    return board
+
+
+TECHNIQUES = [
+    ("easy", hints.naked_single),
+    ("medium", hints.hidden_single),
+    ("hard", hints.naked_pair),
+    ("hard", hints.pointing_pair),
+    ("expert", hints.x_wing),
+]
+
+
+def grade(board):
+    """Difficulty of a puzzle: the hardest technique needed to solve it, or "expert" if they are not enough."""
+    grid = [board[row][col] for row in range(9) for col in range(9)]
+    masks = hints.candidates(grid)
+    hardest = 0
+    while not all(grid):
+        for difficulty, technique in TECHNIQUES:
+            step = technique(grid, masks)
+            if step:
+                if step.cell is not None:
+                    hints.fill(grid, masks, step.cell, step.num)
+                hardest = max(hardest, DIFFICULTIES.index(difficulty))
+                break
+        else:
+            return "expert"
+    return DIFFICULTIES[hardest]
+
+
+def generate(difficulty=None, seed=None, symmetric=True):
+    """Return (puzzle, solution, difficulty) for a random puzzle with a unique solution.
+
+    With a difficulty, puzzles are generated until one grades at that level,
+    up to MAX_ATTEMPTS; the last one is returned if none does.
+    """
+    rng = random.Random(seed)
+    for _ in range(MAX_ATTEMPTS):
+        solution = filled_grid(rng)
+        puzzle = remove_clues([row[:] for row in solution], rng, symmetric)
+        level = grade(puzzle)
+        if difficulty is None or level == difficulty:
+            break
+    return puzzle, solution, level
+
+
+class PuzzlePool:
+    """Puzzles generated ahead of time in a worker process, so taking one is instant."""
+
+    def __init__(self, difficulty=None, size=3):
+        self.difficulty = difficulty
+        self.executor = ProcessPoolExecutor(max_workers=1)
+        self.pending = deque(self.executor.submit(generate, difficulty) for _ in range(size))
+
+    def take(self):
+        """Return (puzzle, solution, difficulty), waiting only if the pool has run dry."""
+        future = self.pending.popleft()
+        self.pending.append(self.executor.submit(generate, self.difficulty))
+        return future.result()
+
+    def close(self):
+        for future in self.pending:
+            future.cancel()
+        self.executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with a unique solution, one per line.")
+    parser.add_argument("count", type=int, nargs="?", default=1, help="puzzles to generate")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES, help="only output puzzles of this difficulty")
+    parser.add_argument("--seed", type=int, help="random seed for repeatable output")
+    parser.add_argument("--asymmetric", action="store_true", help="remove clues without rotational symmetry")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    for _ in range(args.count):
+        puzzle, _, level = generate(args.difficulty, rng.random(), not args.asymmetric)
+        print("".join(str(num) for row in puzzle for num in row) + "," + level)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {args.count} puzzles in {elapsed:.2f}s.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
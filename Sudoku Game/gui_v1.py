@@ -1,6 +1,8 @@
 import tkinter as tk
 import random
 
+import solver
+
 class SudokuGUI:
     def __init__(self, root):
         self.root = root
@@ -19,6 +21,7 @@ class SudokuGUI:
             [0, 0, 0, 0, 8, 0, 0, 7, 9]
         ]
         self.board = [row[:] for row in self.initial_board]  # Copy for game state
+        self.solve_job = None
         self.create_grid()
         self.create_buttons()
 
@@ -40,9 +43,9 @@ class SudokuGUI:
             self.grid.append(row)
 
     def create_buttons(self):
-        """ Create buttons for Solve, AI Move, and Clear """
-        solve_btn = tk.Button(self.root, text="Solve", width=10, height=2, command=self.solve)
-        solve_btn.grid(row=9, column=0, columnspan=2, pady=10)
+        """ Create buttons for Solve, AI Move, Clear and Cancel, the time limit and the status line """
+        self.solve_btn = tk.Button(self.root, text="Solve", width=10, height=2, command=self.solve)
+        self.solve_btn.grid(row=9, column=0, columnspan=2, pady=10)
 
         self.ai_btn = tk.Button(self.root, text="AI Move", width=10, height=2, command=self.ai_move)
         self.ai_btn.grid(row=9, column=2, columnspan=2, pady=10)
@@ -50,6 +53,20 @@ class SudokuGUI:
         clear_btn = tk.Button(self.root, text="Clear", width=10, height=2, command=self.clear_grid)
         clear_btn.grid(row=9, column=4, columnspan=2, pady=10)
 
+        self.cancel_btn = tk.Button(self.root, text="Cancel", width=10, height=2, command=self.cancel_solve,
+                                    state='disabled')
+        self.cancel_btn.grid(row=9, column=6, columnspan=2, pady=10)
+
+        # Solver time limit in seconds
+        tk.Label(self.root, text="Time limit (s):").grid(row=10, column=0, columnspan=2)
+        self.time_limit = tk.Spinbox(self.root, from_=1, to=300, width=4)
+        self.time_limit.delete(0, tk.END)
+        self.time_limit.insert(0, '10')
+        self.time_limit.grid(row=10, column=2)
+
+        self.status = tk.Label(self.root, text="")
+        self.status.grid(row=10, column=3, columnspan=6, sticky='w')
+
     def handle_user_input(self, event, row, col):
         """ Handle user input and validate it in the same cell """
         try:
@@ -78,33 +95,46 @@ class SudokuGUI:
             print(f"Invalid input at ({row}, {col})")
 
     def solve(self):
-        """ Solve the Sudoku puzzle using backtracking """
-        self.board = [row[:] for row in self.initial_board]  # Reset to initial board
-        if self.solve_sudoku(0, 0):
+        """ Solve the Sudoku puzzle on a worker thread, starting from the initial board """
+        if self.solve_job:
+            return
+        try:
+            time_limit = float(self.time_limit.get())
+        except ValueError:
+            time_limit = None
+        self.solve_job = solver.SolveJob(self.initial_board, time_limit)
+        self.solve_btn.config(state='disabled')
+        self.cancel_btn.config(state='normal')
+        self.poll_solve()
+
+    def poll_solve(self):
+        """ Show progress until the worker is done, then show its result """
+        job = self.solve_job
+        if not job.done.is_set():
+            self.status.config(text=f"Solving... {job.nodes} positions, {job.elapsed():.1f}s")
+            self.root.after(50, self.poll_solve)
+            return
+
+        self.solve_job = None
+        self.solve_btn.config(state='normal')
+        self.cancel_btn.config(state='disabled')
+        if job.cancelled:
+            self.status.config(text="Solving cancelled.")
+        elif job.solved:
+            self.board = job.board
             self.update_grid()
+            self.status.config(text=f"Solved in {job.elapsed():.2f}s.")
             print("Sudoku Solved!")
+        elif job.timed_out:
+            self.status.config(text=f"No solution found within {job.time_limit:g}s.")
         else:
+            self.status.config(text="No solution exists!")
             print("No solution exists!")
 
-    def solve_sudoku(self, row, col):
-        """ Backtracking solver for Sudoku """
-        if col == 9:
-            if row == 8:
-                return True
-            row += 1
-            col = 0
-
-        if self.board[row][col] > 0:
-            return self.solve_sudoku(row, col + 1)
-
-        for num in range(1, 10):
-            if self.is_safe(row, col, num):
-                self.board[row][col] = num
-                if self.solve_sudoku(row, col + 1):
-                    return True
-                self.board[row][col] = 0
-
-        return False
+    def cancel_solve(self):
+        """ Stop the running solve """
+        if self.solve_job:
+            self.solve_job.cancel()
 
     def is_safe(self, row, col, num):
         """ Check if placing a number is safe """
@@ -1,10 +1,16 @@
+import argparse
 import tkinter as tk
 from tkinter import messagebox
-import random
+
+import board_view
+import generator
+import hints
+import solver
 
 class SudokuGUI:
-    def __init__(self, root):
+    def __init__(self, root, renderer=board_view.WidgetGrid):
         self.root = root
+        self.renderer = renderer
         self.root.title("Sudoku")
         self.root.configure(bg='black')
 
@@ -13,20 +19,19 @@ class SudokuGUI:
         self.cell_size = 60
         self.selected_cell = None
         self.dragged_number = None
+        self.solve_job = None
+
+        # Value each cell currently shows, and cells whose value may have
+        # changed since, so a redraw only touches cells that differ
+        self.shown = [[None] * 9 for _ in range(9)]
+        self.dirty = set()
 
-        # Initial Sudoku board
-        self.board = [
-            [3, 0, 2, 1, 5, 0, 9, 0, 0],
-            [0, 0, 0, 0, 0, 0, 7, 8, 0],
-            [4, 6, 0, 8, 9, 0, 0, 5, 0],
-            [5, 0, 1, 0, 0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0, 0, 7, 8, 1],
-            [0, 0, 0, 0, 3, 5, 0, 0, 0],
-            [1, 0, 6, 4, 0, 7, 5, 3, 0],
-            [0, 4, 9, 0, 0, 0, 1, 0, 0],
-            [0, 0, 0, 8, 6, 0, 0, 0, 0]
-        ]
-        self.initial_board = [row[:] for row in self.board]
+        # Puzzles are generated in the background, so every game, the
+        # first included, starts on a fresh one
+        self.puzzles = generator.PuzzlePool()
+        self.initial_board, _, _ = self.puzzles.take()
+        self.board = [row[:] for row in self.initial_board]
+        self.hints = hints.HintEngine(self.board)
 
         # Create main frame
         self.main_frame = tk.Frame(root, bg='black')
@@ -36,70 +41,33 @@ class SudokuGUI:
         self.create_numpad()
         self.create_control_buttons()
 
+        # Reason for the last AI move, or solving progress
+        self.status_label = tk.Label(self.root, text='', font=('Arial', 12), bg='black', fg='#00ffff',
+                                     wraplength=600, justify='center')
+        self.status_label.pack(pady=(0, 10))
+
         # Bind keyboard and mouse events
         root.bind('<space>', self.new_game)
         self.root.bind('<B1-Motion>', self. drag)
         self.root.bind('<ButtonRelease-1>', self.handle_drop)
 
     def create_grid(self):
-        """Create the Sudoku grid."""
-        self.cells = []
-        self.grid_frame = tk.Frame(self.main_frame, bg='black', bd=2, relief='solid')
-        self.grid_frame.pack(side='left', padx=(0, 20))
-
-        for i in range(9):
-            row = []
-            for j in range(9):
-                cell_frame = self.create_cell_frame(i, j)
-                label = self.create_cell_label(cell_frame)
-                cell_frame.grid_info = {'row': i, 'column': j}
-                cell_frame.bind('<Button-1>', lambda e, row=i, col=j: self.cell_clicked(row, col))
-                label.bind('<Button-1>', lambda e, row=i, col=j: self.cell_clicked(row, col))
-                row.append(label)
-            self.cells.append(row)
-
-        self.update_display()
-
-    def create_cell_frame(self, i, j):
-        """Create a frame for a single cell."""
-        cell_frame = tk.Frame(
-            self.grid_frame,
-            width=self.cell_size,
-            height=self.cell_size,
-            bg='black',
-            highlightthickness=1,
-            highlightbackground='#333'
-        )
-        cell_frame.grid_propagate(False)
-        cell_frame.grid(row=i, column=j)
-
-        if i % 3 == 0 and i != 0:
-            cell_frame.grid(pady=(2, 0))
-        if j % 3 == 0 and j != 0:
-            cell_frame.grid(padx=(2, 0))
-
-        return cell_frame
-
-    def create_cell_label(self, cell_frame):
-        """Create a label for a cell."""
-        label = tk.Label(
-            cell_frame,
-            text='',
-            font=self.font,
-            bg='black',
-            fg='#00ffff',
-            justify='center'
-        )
-        label.place(relx=0.5, rely=0.5, anchor='center')
-        return label
+        """Create the Sudoku grid with the chosen renderer."""
+        self.grid_view = self.renderer(self.main_frame, 9, self.cell_size, self.font, self.cell_clicked)
+        self.grid_view.widget.pack(side='left', padx=(0, 20))
+        self.update_display(full=True)
 
     def create_control_buttons(self):
-        """Create control buttons (Solve, AI Move, Clear, Reset)."""
+        """Create control buttons (Solve, Cancel, AI Move, Clear, Reset) and the time limit setting."""
         button_frame = tk.Frame(self.root, bg='black')
         button_frame.pack(pady=10)
 
         # Solve button
-        self.create_button(button_frame, "Solve", self.solve_puzzle)
+        self.solve_button = self.create_button(button_frame, "Solve", self.solve_puzzle)
+
+        # Cancel button, only enabled while solving
+        self.cancel_button = self.create_button(button_frame, "Cancel", self.cancel_solve)
+        self.cancel_button.configure(state='disabled')
 
         # AI Move button
         self.create_button(button_frame, "AI Move", self.make_ai_move)
@@ -110,6 +78,15 @@ class SudokuGUI:
         # Reset button
         self.create_button(button_frame, "Reset", self.reset_last_value)
 
+        # Solver time limit in seconds
+        limit_frame = tk.Frame(self.root, bg='black')
+        limit_frame.pack()
+        tk.Label(limit_frame, text="Time limit (s):", font=('Arial', 12), bg='black', fg='#00ffff').pack(side='left')
+        self.time_limit = tk.Spinbox(limit_frame, from_=1, to=300, width=4, font=('Arial', 12))
+        self.time_limit.delete(0, 'end')
+        self.time_limit.insert(0, '10')
+        self.time_limit.pack(side='left', padx=5)
+
     def create_button(self, parent, text, command):
         """Helper method to create a button."""
         btn = tk.Button(
@@ -122,20 +99,24 @@ class SudokuGUI:
             width=10
         )
         btn.pack(side='left', padx=5)
+        return btn
 
     def reset_last_value(self):
         """Remove the last value input without clearing all."""
         if self.selected_cell:
             row, col = self.selected_cell
             if self.initial_board[row][col] == 0 and self.board[row][col] != 0:
-                self.board[row][col] = 0
-                self.cells[row][col].configure(text='')
+                self.set_value(row, col, 0)
+                self.update_display()
+                self.hints.clear(row, col)
 
     def reset_game(self):
         """Reset the game to the initial state."""
         self.board = [row[:] for row in self.initial_board]
+        self.hints.reset(self.board)
+        self.status_label.configure(text='')
         self.selected_cell = None
-        self.update_display()
+        self.update_display(full=True)
         self.clear_victory_message()
 
     def clear_victory_message(self):
@@ -145,65 +126,81 @@ class SudokuGUI:
                 widget.destroy()
 
     def solve_puzzle(self):
-        """Solve the entire Sudoku puzzle."""
-        if self.solve_sudoku():
-            self.update_display()
+        """Solve the entire Sudoku puzzle on a worker thread."""
+        if self.solve_job:
+            return
+        try:
+            time_limit = float(self.time_limit.get())
+        except ValueError:
+            time_limit = None
+        self.solve_job = solver.SolveJob(self.board, time_limit)
+        self.solve_button.configure(state='disabled')
+        self.cancel_button.configure(state='normal')
+        self.poll_solve()
+
+    def poll_solve(self):
+        """Show solving progress, and the result once the worker is done."""
+        job = self.solve_job
+        if not job.done.is_set():
+            self.status_label.configure(text=f"Solving... {job.nodes} positions, {job.elapsed():.1f}s")
+            self.root.after(50, self.poll_solve)
+            return
+
+        self.solve_job = None
+        self.solve_button.configure(state='normal')
+        self.cancel_button.configure(state='disabled')
+        if job.cancelled:
+            self.status_label.configure(text="Solving cancelled.")
+        elif job.solved:
+            self.board = job.board
+            self.update_display(full=True)
+            self.hints.reset(self.board)
+            self.status_label.configure(text=f"Solved in {job.elapsed():.2f}s.")
             if self.check_victory():
                 self.show_victory()
+        elif job.timed_out:
+            self.status_label.configure(text=f"No solution found within {job.time_limit:g}s.")
         else:
+            self.status_label.configure(text='')
             messagebox.showinfo("Error", "No solution exists for this puzzle!")
 
-    def solve_sudoku(self, row=0, col=0):
-        """Recursive function to solve Sudoku."""
-        if row == 9:
-            return True
-
-        if col == 9:
-            return self.solve_sudoku(row + 1, 0)
-
-        if self.board[row][col] != 0:
-            return self.solve_sudoku(row, col + 1)
-
-        for num in range(1, 10):
-            if self.is_valid_move(row, col, num):
-                self.board[row][col] = num
-                if self.solve_sudoku(row, col + 1):
-                    return True
-                self.board[row][col] = 0
-
-        return False
+    def cancel_solve(self):
+        """Stop the running solve."""
+        if self.solve_job:
+            self.solve_job.cancel()
 
     def make_ai_move(self):
-        """Make a single smart move."""
-        if not self.selected_cell:
-            messagebox.showinfo("Info", "Please select a cell first!")
-            return
-
-        row, col = self.selected_cell
-        if self.initial_board[row][col] != 0:
-            messagebox.showinfo("Info", "This cell is part of the initial puzzle!")
+        """Make the next logical move and show why it is correct."""
+        hint = self.hints.hint()
+        if hint is None:
+            if self.hints.solution is None:
+                messagebox.showinfo("Info", "This puzzle has no solution!")
+            else:
+                messagebox.showinfo("Info", "No moves left to make!")
             return
 
-        valid_numbers = [num for num in range(1, 10) if self.is_valid_move(row, col, num)]
-
-        if valid_numbers:
-            number = random.choice(valid_numbers)
-            self.board[row][col] = number
-            self.cells[row][col].configure(text=str(number))
-
-            if self.check_victory():
-                self.show_victory()
+        row, col = hint.row, hint.col
+        self.set_value(row, col, hint.num)
+        self.update_display()
+        if hint.num:
+            self.hints.place(row, col, hint.num)
         else:
-            messagebox.showinfo("Info", "No valid moves available for this cell!")
+            self.hints.clear(row, col)
+        self.cell_clicked(row, col)
+        self.status_label.configure(text=hint.reason)
+
+        if self.check_victory():
+            self.show_victory()
 
     def clear_board(self):
         """Clear all non-initial cells."""
         for i in range(9):
             for j in range(9):
                 if self.initial_board[i][j] == 0:
-                    self.board[i][j] = 0
-                    self.cells[i][j].configure(text='')
+                    self.set_value(i, j, 0)
 
+        self.update_display()
+        self.hints.reset(self.board)
         self.selected_cell = None
 
     def create_numpad(self):
@@ -250,31 +247,21 @@ class SudokuGUI:
         if hasattr(self, 'drag_label') and self.dragged_number:
             self.drag_label.place(x=event.x_root, y=event.y_root, anchor="center")
 
-            for i in range(9):
-                for j in range(9):
-                    cell = self.cells[i][j].master
-                    cell_x = cell.winfo_rootx()
-                    cell_y = cell.winfo_rooty()
-                    if (cell_x <= event.x_root <= cell_x + self.cell_size and 
-                        cell_y <= event.y_root <= cell_y + self.cell_size):
-                        self.cell_clicked(i, j)
-                        return
+            cell = self.grid_view.cell_at(event.x_root, event.y_root)
+            if cell and cell != self.selected_cell:
+                self.cell_clicked(*cell)
 
     def handle_drop(self, event):
         """Handle dropping a number into a cell."""
         if self.dragged_number and self.selected_cell:
             row, col = self.selected_cell
-            if self.initial_board[row][col] == 0:
-                cell = self.cells[row][col].master
-                cell_x = cell.winfo_rootx()
-                cell_y = cell.winfo_rooty()
-                if (cell_x <= event.x_root <= cell_x + self.cell_size and 
-                    cell_y <= event.y_root <= cell_y + self.cell_size):
-                    if self.is_valid_move(row, col, self.dragged_number):
-                        self.board[row][col] = self.dragged_number
-                        self.cells[row][col].configure(text=str(self.dragged_number))
-                        if self.check_victory():
-                            self.show_victory()
+            if (self.initial_board[row][col] == 0 and self.grid_view.cell_at(event.x_root, event.y_root) == (row, col)
+                    and self.is_valid_move(row, col, self.dragged_number)):
+                self.set_value(row, col, self.dragged_number)
+                self.update_display()
+                self.hints.place(row, col, self.dragged_number)
+                if self.check_victory():
+                    self.show_victory()
 
         if hasattr(self, 'drag_label'):
             self.drag_label.destroy()
@@ -286,10 +273,10 @@ class SudokuGUI:
         if self.initial_board[row][col] == 0:
             if self.selected_cell:
                 prev_row, prev_col = self.selected_cell
-                self.cells[prev_row][prev_col].master.configure(bg='black')
+                self.grid_view.highlight(prev_row, prev_col, False)
 
             self.selected_cell = (row, col)
-            self.cells[row][col].master.configure(bg='#333')
+            self.grid_view.highlight(row, col, True)
 
     def is_valid_move(self, row, col, num):
         """Check if a move is valid."""
@@ -304,15 +291,24 @@ class SudokuGUI:
                     return False
         return True
 
-    def update_display(self):
-        """Update the display with current board state."""
-        for i in range(9):
-            for j in range(9):
-                value = self.board[i][j]
-                if value != 0:
-                    self.cells[i][j].configure(text=str(value))
-                else:
-                    self.cells[i][j].configure(text='')
+    def set_value(self, row, col, num):
+        """Change a cell on the board; it is redrawn by the next update_display."""
+        self.board[row][col] = num
+        self.dirty.add((row, col))
+
+    def update_display(self, full=False):
+        """Redraw only the cells whose value changed.
+
+        Normally only cells changed through set_value are checked; full checks
+        all 81, for when the whole board has been replaced.
+        """
+        cells = [(i, j) for i in range(9) for j in range(9)] if full else self.dirty
+        for i, j in cells:
+            value = self.board[i][j]
+            if self.shown[i][j] != value:
+                self.grid_view.show(i, j, str(value) if value else '')
+                self.shown[i][j] = value
+        self.dirty.clear()
 
     def check_victory(self):
         """Check if the puzzle is solved."""
@@ -331,12 +327,24 @@ class SudokuGUI:
         victory_label.pack()
 
     def new_game(self, event=None):
-        """Start a new game."""
+        """Start a new game with the next generated puzzle."""
+        self.cancel_solve()
+        if self.selected_cell:
+            row, col = self.selected_cell
+            self.grid_view.highlight(row, col, False)
+        puzzle, _, _ = self.puzzles.take()
+        self.initial_board = puzzle
         self.reset_game()
-        self.clear_victory_message()
 
 
-root = tk.Tk()
-root.configure(bg='black')
-game = SudokuGUI(root)
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Sudoku.")
+    parser.add_argument("--renderer", choices=board_view.RENDERERS, default="widgets",
+                        help="draw the board with a widget per cell or on a single canvas")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.configure(bg='black')
+    game = SudokuGUI(root, board_view.RENDERERS[args.renderer])
+    root.mainloop()
+    game.puzzles.close()
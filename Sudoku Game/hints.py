@@ -0,0 +1,202 @@
+from collections import namedtuple
+
+import solver
+
+# Candidates are 9-bit masks per cell, as in solver.py, kept up to date as
+# numbers are placed so a hint only has to look for the next deduction.
+# Techniques are tried easiest first. The singles find a number to place and
+# leave the candidates alone; the others only remove candidates, in place,
+# and the search for a single starts over after each one.
+UNITS = solver.ROW_CELLS + solver.COL_CELLS + solver.BOX_CELLS
+UNIT_NAMES = [f"row {i + 1}" for i in range(9)] + [f"column {i + 1}" for i in range(9)] \
+    + [f"box {i + 1}" for i in range(9)]
+PEERS = [sorted(set(solver.ROW_CELLS[cell // 9] + solver.COL_CELLS[cell % 9]
+                    + solver.BOX_CELLS[solver.CELL_UNITS[cell][2]]) - {cell})
+         for cell in range(81)]
+
+# A technique's result: the cell and number to place, or None and 0 when it
+# only removed candidates, and why.
+Step = namedtuple("Step", "cell num reason")
+# A hint for the player; num is 0 when the hint is to clear a wrong number.
+Hint = namedtuple("Hint", "row col num reason")
+
+
+def cell_name(cell):
+    return f"r{cell // 9 + 1}c{cell % 9 + 1}"
+
+
+def digits(mask):
+    return [digit + 1 for digit in range(9) if mask >> digit & 1]
+
+
+def candidates(grid):
+    """Candidate masks for a flat 81-cell grid; filled cells get 0."""
+    masks = [0] * 81
+    for cell in range(81):
+        if not grid[cell]:
+            used = 0
+            for peer in PEERS[cell]:
+                if grid[peer]:
+                    used |= 1 << (grid[peer] - 1)
+            masks[cell] = solver.ALL_DIGITS & ~used
+    return masks
+
+
+def fill(grid, masks, cell, num):
+    """Place num in cell and remove it from the candidates of the cell's peers."""
+    bit = 1 << (num - 1)
+    grid[cell] = num
+    masks[cell] = 0
+    for peer in PEERS[cell]:
+        masks[peer] &= ~bit
+
+
+def _eliminate(masks, cells, bits):
+    """Clear bits from the candidates of cells; returns whether any changed."""
+    changed = False
+    for cell in cells:
+        if masks[cell] & bits:
+            masks[cell] &= ~bits
+            changed = True
+    return changed
+
+
+def naked_single(grid, masks):
+    for cell in range(81):
+        mask = masks[cell]
+        if mask and not mask & (mask - 1):
+            num = mask.bit_length()
+            return Step(cell, num, f"Naked single: {num} is the only candidate left for {cell_name(cell)}.")
+    return None
+
+
+def hidden_single(grid, masks):
+    for unit, cells in enumerate(UNITS):
+        once = twice = 0
+        for cell in cells:
+            twice |= once & masks[cell]
+            once |= masks[cell]
+        hidden = once & ~twice
+        if hidden:
+            num = (hidden & -hidden).bit_length()
+            cell = next(cell for cell in cells if masks[cell] >> (num - 1) & 1)
+            return Step(cell, num, f"Hidden single: {cell_name(cell)} is the only place for {num} "
+                                   f"in {UNIT_NAMES[unit]}.")
+    return None
+
+
+def naked_pair(grid, masks):
+    for unit, cells in enumerate(UNITS):
+        pairs = [cell for cell in cells if solver.POPCOUNT[masks[cell]] == 2]
+        for index, first in enumerate(pairs):
+            for second in pairs[index + 1:]:
+                if masks[first] == masks[second]:
+                    a, b = digits(masks[first])
+                    others = [cell for cell in cells if cell not in (first, second)]
+                    if _eliminate(masks, others, masks[first]):
+                        return Step(None, 0, f"Naked pair: {cell_name(first)} and {cell_name(second)} must hold "
+                                             f"{a} and {b}, so neither can go elsewhere in {UNIT_NAMES[unit]}.")
+    return None
+
+
+def pointing_pair(grid, masks):
+    for box, box_cells in enumerate(solver.BOX_CELLS):
+        for digit in range(9):
+            bit = 1 << digit
+            cells = [cell for cell in box_cells if masks[cell] & bit]
+            if len(cells) < 2:
+                continue
+            for line, line_cells in ((cells[0] // 9, solver.ROW_CELLS[cells[0] // 9]),
+                                     (9 + cells[0] % 9, solver.COL_CELLS[cells[0] % 9])):
+                if all(cell in line_cells for cell in cells):
+                    others = [cell for cell in line_cells if solver.CELL_UNITS[cell][2] != box]
+                    if _eliminate(masks, others, bit):
+                        return Step(None, 0, f"Pointing: in box {box + 1}, {digit + 1} only fits in "
+                                             f"{UNIT_NAMES[line]}, so it is removed from the rest of "
+                                             f"{UNIT_NAMES[line]}.")
+    return None
+
+
+def x_wing(grid, masks):
+    for lines, crossing, offset in ((solver.ROW_CELLS, solver.COL_CELLS, 0), (solver.COL_CELLS, solver.ROW_CELLS, 9)):
+        for digit in range(9):
+            bit = 1 << digit
+            # Lines where the digit has exactly two places, by the crossing lines holding them.
+            spots = {}
+            for line, cells in enumerate(lines):
+                places = tuple(index for index, cell in enumerate(cells) if masks[cell] & bit)
+                if len(places) == 2:
+                    spots.setdefault(places, []).append(line)
+            for places, found in spots.items():
+                if len(found) < 2:
+                    continue
+                first, second = found[:2]
+                others = [cell for cross in places for cell in crossing[cross]
+                          if cell not in lines[first] and cell not in lines[second]]
+                if _eliminate(masks, others, bit):
+                    other = 9 - offset
+                    return Step(None, 0, f"X-wing: {digit + 1} in {UNIT_NAMES[offset + first]} and "
+                                         f"{UNIT_NAMES[offset + second]} only fits in "
+                                         f"{UNIT_NAMES[other + places[0]]} and {UNIT_NAMES[other + places[1]]}, "
+                                         f"so it is removed from the rest of those lines.")
+    return None
+
+
+TECHNIQUES = [naked_single, hidden_single, naked_pair, pointing_pair, x_wing]
+
+
+class HintEngine:
+    """Next logical move for a 9x9 board as the player fills it in.
+
+    The board is solved once up front so mistakes can be pointed out; after
+    that each hint only looks for the next deduction from the kept
+    candidates.
+    """
+
+    def __init__(self, board):
+        self.reset(board)
+
+    def reset(self, board):
+        self.grid = [board[row][col] for row in range(9) for col in range(9)]
+        self.masks = candidates(self.grid)
+        solution = [row[:] for row in board]
+        self.solution = [num for row in solution for num in row] if solver.solve(solution) else None
+
+    def place(self, row, col, num):
+        fill(self.grid, self.masks, row * 9 + col, num)
+
+    def clear(self, row, col):
+        # Candidates removed because of the number may have been removed by
+        # techniques too, so they are worked out again from the grid.
+        self.grid[row * 9 + col] = 0
+        self.masks = candidates(self.grid)
+
+    def hint(self):
+        """Return a Hint for the next move, or None if the board has no solution."""
+        if self.solution is None:
+            return None
+        for cell, num in enumerate(self.grid):
+            if num and num != self.solution[cell]:
+                return Hint(cell // 9, cell % 9, 0, f"The {num} in {cell_name(cell)} is wrong.")
+        removed = []
+        while True:
+            for technique in TECHNIQUES:
+                step = technique(self.grid, self.masks)
+                if step:
+                    break
+            else:
+                break
+            if step.cell is not None:
+                reason = step.reason
+                if removed:
+                    reason += " Found after: " + " ".join(removed)
+                return Hint(step.cell // 9, step.cell % 9, step.num, reason)
+            removed.append(step.reason)
+        # No technique here is enough; fall back on the solution for the
+        # empty cell with the fewest candidates.
+        empty = [cell for cell in range(81) if not self.grid[cell]]
+        if not empty:
+            return None
+        cell = min(empty, key=lambda cell: solver.POPCOUNT[self.masks[cell]])
+        num = self.solution[cell]
+        return Hint(cell // 9, cell % 9, num, f"No simple technique applies; {num} goes in {cell_name(cell)}.")
@@ -0,0 +1,194 @@
+import threading
+import time
+
+import dlx
+
+# Each row, column and box keeps a 9-bit mask of the digits already placed in
+# it, so a cell's candidates are the bits missing from its three masks. The
+# solver fills naked singles (cells with one candidate) and hidden singles
+# (digits with one possible cell in a unit), then branches on whichever has
+# the fewest alternatives: the empty cell with the fewest candidates or the
+# unit and digit with the fewest places, the same choice dancing links makes.
+ALL_DIGITS = 0x1FF
+
+CELL_UNITS = [(cell // 9, cell % 9, cell // 27 * 3 + cell % 9 // 3) for cell in range(81)]
+ROW_CELLS = [[row * 9 + col for col in range(9)] for row in range(9)]
+COL_CELLS = [[row * 9 + col for row in range(9)] for col in range(9)]
+BOX_CELLS = [[cell for cell in range(81) if CELL_UNITS[cell][2] == box] for box in range(9)]
+POPCOUNT = [bin(mask).count("1") for mask in range(ALL_DIGITS + 1)]
+
+
+def _place(grid, rows, cols, boxes, cell, bit):
+    row, col, box = CELL_UNITS[cell]
+    grid[cell] = bit.bit_length()
+    rows[row] |= bit
+    cols[col] |= bit
+    boxes[box] |= bit
+
+
+def _unplace(grid, rows, cols, boxes, cell):
+    row, col, box = CELL_UNITS[cell]
+    bit = 1 << (grid[cell] - 1)
+    grid[cell] = 0
+    rows[row] ^= bit
+    cols[col] ^= bit
+    boxes[box] ^= bit
+
+
+def _propagate(grid, rows, cols, boxes, placed):
+    """Fill naked and hidden singles until there are none left.
+
+    Cells filled are appended to placed. Returns the (cell, bit) placements
+    to branch on, one of which must hold, an empty list if the grid is full,
+    or None if some cell or unit can no longer be completed.
+    """
+    units = ((rows, ROW_CELLS), (cols, COL_CELLS), (boxes, BOX_CELLS))
+    while True:
+        candidates = [0] * 81
+        best, best_mask, best_count = None, 0, 10
+        changed = False
+        for cell in range(81):
+            if grid[cell]:
+                continue
+            row, col, box = CELL_UNITS[cell]
+            mask = ALL_DIGITS & ~(rows[row] | cols[col] | boxes[box])
+            if not mask:
+                return None
+            if not mask & (mask - 1):
+                _place(grid, rows, cols, boxes, cell, mask)
+                placed.append(cell)
+                changed = True
+            else:
+                candidates[cell] = mask
+                count = POPCOUNT[mask]
+                if count < best_count:
+                    best, best_mask, best_count = cell, mask, count
+        if changed:
+            continue
+
+        for masks, unit_cells in units:
+            for unit, cells in enumerate(unit_cells):
+                once = twice = 0
+                for cell in cells:
+                    twice |= once & candidates[cell]
+                    once |= candidates[cell]
+                if once | masks[unit] != ALL_DIGITS:
+                    return None
+                hidden = once & ~twice
+                if hidden:
+                    bit = hidden & -hidden
+                    for cell in cells:
+                        if candidates[cell] & bit:
+                            break
+                    _place(grid, rows, cols, boxes, cell, bit)
+                    placed.append(cell)
+                    changed = True
+                    break
+            if changed:
+                break
+        if not changed:
+            break
+
+    if best is None:
+        return []
+    branches = []
+    while best_mask:
+        bit = best_mask & -best_mask
+        best_mask ^= bit
+        branches.append((best, bit))
+    if best_count > 2:
+        # A digit with fewer places in some unit than the best cell has
+        # candidates makes a narrower branch.
+        for unit_cells in (ROW_CELLS, COL_CELLS, BOX_CELLS):
+            for cells in unit_cells:
+                for digit in range(9):
+                    bit = 1 << digit
+                    places = [cell for cell in cells if candidates[cell] & bit]
+                    if 1 < len(places) < len(branches):
+                        branches = [(cell, bit) for cell in places]
+                        if len(branches) == 2:
+                            return branches
+    return branches
+
+
+def _search(grid, rows, cols, boxes, stop):
+    if stop is not None and stop():
+        return False
+    placed = []
+    branches = _propagate(grid, rows, cols, boxes, placed)
+    if branches is not None:
+        if not branches:
+            return True
+        for cell, bit in branches:
+            _place(grid, rows, cols, boxes, cell, bit)
+            if _search(grid, rows, cols, boxes, stop):
+                return True
+            _unplace(grid, rows, cols, boxes, cell)
+    for cell in placed:
+        _unplace(grid, rows, cols, boxes, cell)
+    return False
+
+
+def solve(board, stop=None):
+    """Solve a 9x9 board (lists of ints, 0 for empty) in place.
+
+    Returns True if it was solved, or False, leaving the board unchanged, if
+    the givens conflict or there is no solution. stop, if given, is called at
+    every search node and abandons the search, returning False, once it
+    returns True. Other n^2 x n^2 sizes are handed to the dancing links
+    solver, which does not take stop.
+    """
+    if len(board) != 9:
+        return dlx.solve(board)
+    grid = [board[row][col] for row in range(9) for col in range(9)]
+    rows, cols, boxes = [0] * 9, [0] * 9, [0] * 9
+    for cell, num in enumerate(grid):
+        if num:
+            row, col, box = CELL_UNITS[cell]
+            bit = 1 << (num - 1)
+            if (rows[row] | cols[col] | boxes[box]) & bit:
+                return False
+            rows[row] |= bit
+            cols[col] |= bit
+            boxes[box] |= bit
+    if not _search(grid, rows, cols, boxes, stop):
+        return False
+    for cell, num in enumerate(grid):
+        board[cell // 9][cell % 9] = num
+    return True
+
+
+class SolveJob:
+    """Solve a copy of a board on a background thread, with a time limit and cancelling.
+
+    Poll done from the UI thread; nodes and elapsed() report progress. Once
+    done is set, solved says whether board holds the solution, and cancelled
+    or timed_out whether the search was cut short.
+    """
+
+    def __init__(self, board, time_limit=None):
+        self.board = [row[:] for row in board]
+        self.time_limit = time_limit
+        self.nodes = 0
+        self.solved = self.cancelled = self.timed_out = False
+        self.done = threading.Event()
+        self.start = time.perf_counter()
+        self.end = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def elapsed(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _stop(self):
+        self.nodes += 1
+        if self.time_limit is not None and self.elapsed() > self.time_limit:
+            self.timed_out = True
+        return self.cancelled or self.timed_out
+
+    def _run(self):
+        self.solved = solve(self.board, self._stop)
+        self.end = time.perf_counter()
+        self.done.set()
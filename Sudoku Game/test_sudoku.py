@@ -0,0 +1,180 @@
+import io
+import random
+from math import isqrt
+
+import pytest
+
+import dlx
+import generator
+import solver
+from hints import HintEngine
+from sudoku import format_board, parse_puzzle, solve_stream
+
+# Puzzles with exactly one solution, from easy to very hard.
+UNIQUE_PUZZLES = [
+    "530070000600195000098000060800060003400803001700020006060000280000419005000080079",
+    "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+    "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97..",
+    "020700000000080604080004020007060400900208006002090300070100080609070000000005060",
+]
+# Givens that do not clash, but no solution exists.
+UNSOLVABLE_PUZZLE = ".....5.8....6.1.43..........1.5........1.6...3.......553.....61........4........."
+# A puzzle file with lines that are not puzzles, which are echoed but not counted.
+MIXED_INPUT = "\n".join([UNIQUE_PUZZLES[0], "", "not a puzzle", UNIQUE_PUZZLES[1] + ",with a comment",
+                         UNSOLVABLE_PUZZLE]) + "\n"
+
+# Puzzles by the hardest technique they need; the expert one is finished
+# by the techniques once an X-wing is found.
+GRADED_PUZZLES = {
+    "easy": "530070000600195000098000060800060003400803001700020006060000280000419005000080079",
+    "medium": "002000004006300800080501090200903500000040000004605003040208050001009400900000700",
+    "hard": "000005001000007800032060005003002006046090380800700400300050120004100000200600000",
+    "expert": "000160700001402009000030002100020045090000060540070008700040000900701500008093000",
+}
+
+
+def is_solution(board, puzzle):
+    size = len(board)
+    box_size = isqrt(size)
+    digits = set(range(1, size + 1))
+    for i in range(size):
+        box_row, box_col = i // box_size * box_size, i % box_size * box_size
+        box = {board[box_row + r][box_col + c] for r in range(box_size) for c in range(box_size)}
+        if set(board[i]) != digits or {row[i] for row in board} != digits or box != digits:
+            return False
+    return all(not given or given == num
+               for given_row, row in zip(puzzle, board) for given, num in zip(given_row, row))
+
+
+@pytest.mark.parametrize("line", UNIQUE_PUZZLES)
+def test_solve(line):
+    puzzle = parse_puzzle(line)
+    board = [row[:] for row in puzzle]
+    assert solver.solve(board)
+    assert is_solution(board, puzzle)
+
+
+def test_unsolvable():
+    puzzle = parse_puzzle(UNSOLVABLE_PUZZLE)
+    board = [row[:] for row in puzzle]
+    assert not solver.solve(board)
+    assert board == puzzle
+
+
+@pytest.mark.parametrize("line", UNIQUE_PUZZLES)
+def test_dlx_agrees(line):
+    puzzle = parse_puzzle(line)
+    board = [row[:] for row in puzzle]
+    assert solver.solve(board)
+    exact = [row[:] for row in puzzle]
+    assert dlx.solve(exact)
+    assert exact == board
+    assert dlx.count_solutions(puzzle, 2) == 1
+
+
+def test_dlx_unsolvable():
+    puzzle = parse_puzzle(UNSOLVABLE_PUZZLE)
+    board = [row[:] for row in puzzle]
+    assert not dlx.solve(board)
+    assert board == puzzle
+    assert dlx.count_solutions(puzzle) == 0
+
+
+def test_count_stops_at_limit():
+    assert dlx.count_solutions([[0] * 9 for _ in range(9)], 2) == 2
+
+
+def test_larger_board():
+    # A valid 16x16 grid with every other cell emptied.
+    full = [[(row * 4 + row // 4 + col) % 16 + 1 for col in range(16)] for row in range(16)]
+    puzzle = [[num if (row + col) % 2 else 0 for col, num in enumerate(values)] for row, values in enumerate(full)]
+    board = [row[:] for row in puzzle]
+    assert solver.solve(board)
+    assert is_solution(board, puzzle)
+    exact = [row[:] for row in puzzle]
+    assert dlx.solve(exact)
+    assert is_solution(exact, puzzle)
+
+
+
+def test_batch_agrees():
+    np = pytest.importorskip("numpy")
+    import batch
+
+    lines = UNIQUE_PUZZLES + [UNSOLVABLE_PUZZLE]
+    puzzles = [format_board(parse_puzzle(line)) for line in lines]
+    grids = np.frombuffer("".join(puzzles).encode(), dtype=np.uint8).reshape(-1, 81) - ord("0")
+    solved = batch.solve_batch(grids)
+    for line, grid, ok in zip(lines, grids, solved):
+        board = parse_puzzle(line)
+        assert ok == solver.solve(board)
+        if ok:
+            assert grid.reshape(9, 9).tolist() == board
+
+
+def test_solve_stream_counts_puzzles():
+    output = io.StringIO()
+    puzzles, solved, latencies = solve_stream(io.StringIO(MIXED_INPUT), output, workers=1, chunk_size=2)
+    assert (puzzles, solved, latencies.total) == (3, 2, 3)
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 5
+    assert lines[1:3] == [",", "not a puzzle,"]
+    assert lines[3].startswith(UNIQUE_PUZZLES[1].replace(".", "0") + ",")
+    assert lines[4].endswith(",")
+
+
+def test_batch_run_counts_puzzles():
+    pytest.importorskip("numpy")
+    import batch
+
+    output = io.StringIO()
+    assert batch.run(io.StringIO(MIXED_INPUT), output, batch_size=2) == (3, 2)
+    assert len(output.getvalue().splitlines()) == 5
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_generated_puzzle_is_unique(seed):
+    puzzle, solution, level = generator.generate(seed=seed)
+    assert dlx.count_solutions(puzzle, 2) == 1
+    assert is_solution(solution, puzzle)
+    assert level == generator.grade(puzzle)
+
+
+def test_generate_difficulty():
+    _, _, level = generator.generate("hard", seed=0)
+    assert level == "hard"
+
+
+@pytest.mark.parametrize("level, line", GRADED_PUZZLES.items())
+def test_grade(level, line):
+    assert generator.grade(parse_puzzle(line)) == level
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_hints_follow_solution(seed):
+    puzzle, solution, _ = generator.generate(seed=seed)
+    board = [row[:] for row in puzzle]
+    engine = HintEngine(board)
+    rng = random.Random(seed)
+    while any(0 in row for row in board):
+        if rng.random() < 0.2:
+            # A wrong number must be the next thing pointed out.
+            row, col = rng.choice([(r, c) for r in range(9) for c in range(9) if not board[r][c]])
+            wrong = rng.choice([num for num in range(1, 10) if num != solution[row][col]])
+            board[row][col] = wrong
+            engine.place(row, col, wrong)
+            hint = engine.hint()
+            assert (hint.row, hint.col, hint.num) == (row, col, 0)
+            board[row][col] = 0
+            engine.clear(row, col)
+        hint = engine.hint()
+        assert not board[hint.row][hint.col]
+        assert hint.num == solution[hint.row][hint.col]
+        board[hint.row][hint.col] = hint.num
+        engine.place(hint.row, hint.col, hint.num)
+    assert board == solution
+    assert engine.hint() is None
+
+
+def test_no_hint_without_solution():
+    assert HintEngine(parse_puzzle(UNSOLVABLE_PUZZLE)).hint() is None